@@ -0,0 +1,70 @@
+import argparse
+import sys
+
+from engine import Searcher
+from engine.parallel import ParallelSearcher
+from rules.fen import START_FEN
+from rules.position import Position, move_to_uci
+
+# (name, FEN) of the positions searched by the benchmark
+POSITIONS = [
+    ("start", START_FEN),
+    ("kiwipete", "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"),
+    ("middlegame", "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10"),
+    ("open game", "r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4"),
+    ("rook endgame", "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1"),
+    ("promotions", "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1"),
+]
+
+
+def run_search(name, fen, searcher, time_limit, max_depth):
+    """Search one position, print the result line and return the SearchResult."""
+    result = searcher.search(Position.from_fen(fen), time_limit, max_depth)
+    move = move_to_uci(result.move) if result.move is not None else "-"
+    print(f"{name:<28} depth {result.depth:>2}  nodes {result.nodes:>8}  {result.elapsed:6.2f}s  "
+          f"{result.nps:>8.0f} nps  move {move:<6} score {result.score}")
+    return result
+
+
+def print_total(label, results):
+    nodes = sum(result.nodes for result in results)
+    elapsed = sum(result.elapsed for result in results)
+    depth = sum(result.depth for result in results) / len(results)
+    print(f"{label:<28} nodes {nodes}  {elapsed:.2f}s  {nodes / elapsed if elapsed > 0 else 0.0:.0f} nps  "
+          f"mean depth {depth:.1f}")
+    return elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search fixed positions and report depth and nodes/second.")
+    parser.add_argument("--fen", help="position to search (default: the benchmark positions)")
+    parser.add_argument("--time", type=float, default=2.0, help="seconds per position (default: 2.0)")
+    parser.add_argument("--depth", type=int,
+                        help="search every position to this depth instead, without time limit")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="also run the shared-table parallel search with this many processes "
+                             "and compare it with the single-process search")
+    args = parser.parse_args(argv)
+
+    positions = [("custom", args.fen)] if args.fen else POSITIONS
+    time_limit, max_depth = (float("inf"), args.depth) if args.depth else (args.time, 64)
+    # Every position starts from an empty table so that runs are comparable
+    single = [run_search(name, fen, Searcher(), time_limit, max_depth) for name, fen in positions]
+    single_elapsed = print_total("total (1 process)", single)
+    if args.workers > 1:
+        parallel = []
+        with ParallelSearcher(args.workers) as searcher:
+            for name, fen in positions:
+                searcher.table.clear()
+                parallel.append(run_search(f"{name} ({args.workers} processes)", fen, searcher, time_limit, max_depth))
+        parallel_elapsed = print_total(f"total ({args.workers} processes)", parallel)
+        if args.depth:
+            print(f"time-to-depth speedup {single_elapsed / parallel_elapsed:.2f}x")
+        else:
+            mean_depth = sum(result.depth for result in parallel) / len(parallel)
+            print(f"mean depth {sum(result.depth for result in single) / len(single):.1f} -> {mean_depth:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
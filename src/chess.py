@@ -1,10 +1,26 @@
+import argparse
+import logging
 import pygame
 from utils import load_images
-from board import init_board, draw_board, reset_board
-from events import handle_events
+from engine import Searcher
+from engine.book import OpeningBook
+from engine.parallel import ParallelSearcher
+from events import handle_engine_move, handle_event
+from renderer import BoardRenderer
+from rules import instrument
+from rules.fen import START_FEN
+from rules.state import GameState
+from rules.status import GameStatusCache
+from rules.tablebase import DRAW, WIN, Tablebases
 
 # --- Constantes ---
 WIDTH, HEIGHT = 600, 600
+FRAME_RATE_CAP = 60  # Maximum number of redraws per second
+HUMAN, ENGINE = 'human', 'engine'
+DEFAULT_THINK_TIME = 1.0  # Seconds the engine may spend on each move
+LOG_LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR')
+
+logger = logging.getLogger(__name__)
 
 def initialize_game():
     """Initialize the game and return the necessary objects."""
@@ -12,25 +28,23 @@ def initialize_game():
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption("Échecs")
     pieces = load_images()
-    board, white_king_pos, black_king_pos = init_board()  # Unpack king positions
-    # Debugging: Print the structure of board_data
-    print("Debug: board_data initialized:", board)
-    return screen, pieces, board, white_king_pos, black_king_pos
+    return screen, pieces
+
+def reset_game_state(fen=None):
+    """Return a new GameState for the initial position, or for the position of a FEN string."""
+    state = GameState.from_fen(fen or START_FEN)
+    logger.debug("Game state reset: %s", state.to_fen())
+    return state
 
-def reset_game_state():
-    """Reset the game state to the initial position."""
-    board, white_king_pos, black_king_pos = reset_board()  # Unpack king positions
-    # Debugging: Print the structure of board_data
-    print("Debug: board_data reset:", board)
-    selected_piece = None
-    white_turn = True
-    last_pawn_double_move = None
-    # Use the simplified castling rights structure - we don't need the extra tracking flags
-    castling_rights = {
-        'white': {'kingside': True, 'queenside': True},
-        'black': {'kingside': True, 'queenside': True}
-    }
-    return board, white_king_pos, black_king_pos, selected_piece, white_turn, last_pawn_double_move, castling_rights
+def window_caption(status, white_turn):
+    """Return the window title, with the perfect-play result when an endgame table covers the position."""
+    if status.endgame is None:
+        return "Échecs"
+    result, plies = status.endgame
+    if result == DRAW:
+        return "Échecs - nulle avec un jeu parfait"
+    white_wins = white_turn if result == WIN else not white_turn
+    return f"Échecs - les {'blancs' if white_wins else 'noirs'} matent en {(plies + 1) // 2} coups"
 
 # Remove or comment out the conflicting function
 # def init_castling_rights():
@@ -46,39 +60,105 @@ def reset_game_state():
 #         'black_queenside_rook_moved': False
 #     }
 
-def game_loop(screen, pieces, board, white_king_pos, black_king_pos):
-    """Main game loop."""
-    board, white_king_pos, black_king_pos, selected_piece, white_turn, last_pawn_double_move, castling_rights = reset_game_state()
-    running = True
+def game_loop(screen, pieces, fen=None, players=(HUMAN, HUMAN), think_time=DEFAULT_THINK_TIME, engine_workers=1, book=None, tablebase_dir=None):
+    """Main game loop. players gives who plays white and black: HUMAN or ENGINE.
+
+    book is an optional OpeningBook the engine plays from while the game is in it.
+    The endgame tables of tablebase_dir, when given, let the engine play covered
+    endgames perfectly and the window title show their result.
+    """
+    tablebases = Tablebases(tablebase_dir) if tablebase_dir is not None else None
+    state = reset_game_state(fen)
+    promotion = None  # Pending promotion dialog, modal while it is open
+    # The status of the current position is only recomputed after a move has been made
+    status_cache = GameStatusCache(tablebases)
+    # Only the squares that changed since the previous frame are redrawn and pushed to the display
+    renderer = BoardRenderer(screen, pieces)
+    clock = pygame.time.Clock()
+    # One searcher for the whole game so its transposition table carries over between moves
+    searcher = None
+    if ENGINE in players:
+        if engine_workers > 1:
+            searcher = ParallelSearcher(engine_workers, tablebase_dir=tablebase_dir)
+        else:
+            searcher = Searcher(tablebases=tablebases)
+    # Mouse motion never changes the game, so it should not wake the loop up
+    pygame.event.set_blocked(pygame.MOUSEMOTION)
+
+    status = status_cache.get(state)
+    pygame.display.set_caption(window_caption(status, state.white_turn))
+    renderer.render(state, status)
 
-    while running:
-        # Validate board structure before passing it to handle_events
-        if not isinstance(board, list) or not all(isinstance(row, list) for row in board):
-            # Debug: Print the actual structure of board
-            print("Debug: board structure:", type(board), "contains:", board)
-            raise ValueError("Invalid board structure in game_loop")
-        
-        # Create board_data tuple for draw_board function
-        board_data = (board, white_king_pos, black_king_pos)
-        
-        selected_piece, white_turn, running, last_pawn_double_move, castling_rights, white_king_pos, black_king_pos = handle_events(
-            board, selected_piece, white_turn, last_pawn_double_move, castling_rights, screen, pieces, white_king_pos, black_king_pos
-        )
-        
-        if running:
-            # Update board_data with current values
-            board_data = (board, white_king_pos, black_king_pos)
-            draw_board(screen, board_data, selected_piece, pieces, white_turn, last_pawn_double_move, castling_rights)
-            pygame.display.flip()
+    while state.running:
+        previous_ply = state.ply
+        if players[0 if state.white_turn else 1] == ENGINE and not (status.checkmate or status.draw):
+            handle_engine_move(searcher, state, think_time, book)
+            # Input that arrived while the engine was thinking is dropped, except closing the window
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    state.running = False
+                elif event.type == pygame.WINDOWEXPOSED:
+                    renderer.invalidate()
         else:
-            board_data = (board, white_king_pos, black_king_pos)
-            draw_board(screen, board_data, selected_piece, pieces, white_turn, last_pawn_double_move, castling_rights)
-            pygame.display.flip()  # Ensure the checkmate message is displayed before quitting
+            # Sleep until there is input instead of polling
+            event = pygame.event.wait()
+            if event.type == pygame.WINDOWEXPOSED:
+                renderer.invalidate()
+
+            promotion = handle_event(event, state, status, screen, pieces, promotion)
+        if state.ply != previous_ply:
+            # A move was made: the cached status no longer applies
+            status = status_cache.get(state)
+            pygame.display.set_caption(window_caption(status, state.white_turn))
+            if status.checkmate or status.draw:
+                state.running = False  # Stop the game
+
+        if promotion is None:
+            renderer.render(state, status)
+        if not state.running:
+            renderer.render_game_over(status, state.white_turn)  # Ensure the checkmate message is displayed before quitting
+        clock.tick(FRAME_RATE_CAP)  # Bound the redraw rate during bursts of input
+        instrument.tick()  # Periodic counters report, when enabled
+
+    if isinstance(searcher, ParallelSearcher):
+        searcher.close()  # Stop the helper processes
+    if tablebases is not None:
+        tablebases.close()
 
 def main():
     """Main entry point of the program."""
-    screen, pieces, board, white_king_pos, black_king_pos = initialize_game()
-    game_loop(screen, pieces, board, white_king_pos, black_king_pos)
+    parser = argparse.ArgumentParser(description="Play chess against another player or the computer.")
+    parser.add_argument("--fen", help="start from this position instead of the initial one")
+    parser.add_argument("--white", choices=(HUMAN, ENGINE), default=HUMAN, help="who plays white (default: human)")
+    parser.add_argument("--black", choices=(HUMAN, ENGINE), default=HUMAN, help="who plays black (default: human)")
+    parser.add_argument("--think-time", type=float, default=DEFAULT_THINK_TIME,
+                        help=f"seconds the engine spends on each move (default: {DEFAULT_THINK_TIME})")
+    parser.add_argument("--engine-workers", type=int, default=1,
+                        help="processes the engine searches with, sharing one transposition table (default: 1)")
+    parser.add_argument("--book", help="opening book file the engine plays its first moves from (see makebook.py)")
+    parser.add_argument("--tablebases", help="directory of endgame tables (see maketablebase.py)")
+    parser.add_argument("--log-level", choices=LOG_LEVELS, default='INFO',
+                        help="lowest level of the messages written to stderr (default: INFO)")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level, format="%(levelname)s %(name)s: %(message)s")
+    if args.fen is not None:
+        try:
+            GameState.from_fen(args.fen)  # Reject an invalid FEN before the window opens
+        except ValueError as error:
+            parser.error(str(error))
+    try:
+        book = OpeningBook(args.book) if args.book is not None else None
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+    if args.tablebases is not None:
+        try:
+            Tablebases(args.tablebases).close()  # Reject a missing directory or a corrupt table before the window opens
+        except (OSError, ValueError) as error:
+            parser.error(str(error))
+    screen, pieces = initialize_game()
+    game_loop(screen, pieces, args.fen, (args.white, args.black), args.think_time, args.engine_workers, book, args.tablebases)
+    if book is not None:
+        book.close()
     pygame.quit()
 
 if __name__ == "__main__":
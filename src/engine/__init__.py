@@ -0,0 +1,5 @@
+"""Computer player: static evaluation and alpha-beta search on top of the rules package."""
+from .evaluate import evaluate
+from .search import SearchResult, Searcher
+
+__all__ = ['SearchResult', 'Searcher', 'evaluate']
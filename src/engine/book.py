@@ -0,0 +1,134 @@
+# --- Bibliothèque d'ouvertures ---
+# Binary opening book in the Polyglot record layout: 16-byte big-endian records
+# (key, move, weight, learn) sorted by key. The file is memory-mapped and searched
+# by bisection, so opening a book of any size is instant and only the pages that
+# are actually probed are read. Keys are the Zobrist keys of rules.zobrist and
+# moves are the 16-bit moves of rules.position, so the books are written by
+# build_book/write_book rather than taken from other programs.
+import mmap
+import random
+import struct
+
+from rules.movegen import generate_legal_moves
+from rules.pgn import IllegalMoveError, parse_san
+
+RECORD = struct.Struct('>QHHI')
+_KEY = struct.Struct('>Q')
+MAX_WEIGHT = 0xFFFF
+DEFAULT_BOOK_PLIES = 20  # Half-moves of every game recorded by build_book
+
+
+class OpeningBook:
+    """Read-only opening book mapped in memory.
+
+    Use it as a context manager, or call close() once it is no longer needed.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.file.seek(0, 2)
+        size = self.file.tell()
+        if size % RECORD.size:
+            self.file.close()
+            raise ValueError(f"{path} is not an opening book: its size is not a multiple of {RECORD.size} bytes")
+        # An empty file cannot be mapped, and has nothing to find anyway
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self.count = size // RECORD.size
+
+    def __len__(self):
+        return self.count
+
+    def _first_index(self, key):
+        # Index of the first record whose key is not smaller than key
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if _KEY.unpack_from(self.data, middle * RECORD.size)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def probe(self, key):
+        """Return the (move, weight) pairs stored for a Zobrist key, without checking them."""
+        entries = []
+        for index in range(self._first_index(key), self.count):
+            entry_key, move, weight, _ = RECORD.unpack_from(self.data, index * RECORD.size)
+            if entry_key != key:
+                break
+            entries.append((move, weight))
+        return entries
+
+    def moves(self, position):
+        """Return the legal book moves of the position as (move, weight) pairs, best first."""
+        entries = self.probe(position.key)
+        if not entries:
+            return []
+        # A key collision must not make the engine play an illegal move
+        legal = set(generate_legal_moves(position))
+        return sorted(((move, weight) for move, weight in entries if move in legal and weight),
+                      key=lambda entry: entry[1], reverse=True)
+
+    def choose(self, position, rng=random):
+        """Pick a book move at random in proportion to its weight, or return None when out of book."""
+        entries = self.moves(position)
+        if not entries:
+            return None
+        return rng.choices([move for move, _ in entries], [weight for _, weight in entries])[0]
+
+    def close(self):
+        if self.count:
+            self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def build_book(games, max_plies=DEFAULT_BOOK_PLIES, min_games=1):
+    """Return {(key, move): weight} for the first max_plies half-moves of an iterable of PgnGame.
+
+    Every move gets 2 points when the side that played it won, 1 for a draw or an
+    unknown result and 0 for a loss. Moves played in fewer than min_games games
+    are left out. Games stop counting at their first illegal move.
+    """
+    weights = {}
+    counts = {}
+    for game in games:
+        try:
+            position = game.start_position()
+        except ValueError:
+            continue
+        for san in game.moves[:max_plies]:
+            try:
+                move = parse_san(position, san)
+            except IllegalMoveError:
+                break
+            if game.result == '1-0':
+                points = 2 if position.white_turn else 0
+            elif game.result == '0-1':
+                points = 0 if position.white_turn else 2
+            else:
+                points = 1
+            entry = (position.key, move)
+            weights[entry] = weights.get(entry, 0) + points
+            counts[entry] = counts.get(entry, 0) + 1
+            position.make_move(move)
+    return {entry: weight for entry, weight in weights.items() if counts[entry] >= min_games}
+
+
+def write_book(path, entries):
+    """Write {(key, move): weight} as a sorted book file and return the number of records written.
+
+    Weights are scaled down together when the largest does not fit in 16 bits.
+    """
+    largest = max(entries.values(), default=0)
+    scale = max(1, -(-largest // MAX_WEIGHT))
+    records = sorted(entries.items())
+    with open(path, 'wb') as book:
+        for (key, move), weight in records:
+            book.write(RECORD.pack(key, move, weight // scale, 0))
+    return len(records)
@@ -0,0 +1,206 @@
+# --- Recherche parallèle ---
+# Several searcher processes search the same position and share what they find
+# through one transposition table in shared memory. Each helper orders the root
+# moves differently, so the processes fill the table with different parts of the
+# tree and the main search gets deeper in the same time.
+import logging
+import multiprocessing
+import queue
+import time
+from multiprocessing import shared_memory
+
+from rules.position import Position
+from rules.tablebase import Tablebases
+
+from .search import Searcher
+
+_SCORE_OFFSET = 1 << 31
+RESULT_POLL = 0.1  # Seconds between two checks that the helpers are still alive
+HELPER_GRACE = 2.0  # Seconds a helper may take to report after the main search, before it is given up on
+
+logger = logging.getLogger(__name__)
+
+
+class SharedTranspositionTable:
+    """Transposition table stored in shared memory, usable from several processes at once.
+
+    Each slot holds two 64-bit words: the packed entry and the Zobrist key
+    XOR-ed with it. An entry is only returned when both words agree, so a slot
+    half-written by another process is seen as a miss instead of as a wrong
+    entry, and no lock is needed. Entries are (depth, score, bound, move)
+    tuples, like the ones Searcher stores, and replacement follows the
+    TranspositionTable policy.
+
+    The generation is one more word of the shared memory, so every process
+    ages entries alike. Only the table that created the memory advances it;
+    tables attached by name follow.
+    """
+
+    def __init__(self, size_bits=20, name=None):
+        size = 1 << size_bits
+        self.size_bits = size_bits
+        self.mask = size - 1
+        self.owner = name is None
+        if self.owner:
+            self.memory = shared_memory.SharedMemory(create=True, size=size * 16 + 8)
+            self.memory.buf[:] = bytes(len(self.memory.buf))
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        self.slots = self.memory.buf.cast('Q')
+        self._generation_index = 2 * size  # The word after the last slot
+
+    @property
+    def generation(self):
+        return self.slots[self._generation_index]
+
+    @property
+    def name(self):
+        return self.memory.name
+
+    def probe(self, key, depth=0):
+        """Return the entry stored for key if it was computed to at least depth, else None."""
+        index = (key & self.mask) << 1
+        data = self.slots[index + 1]
+        if not data or self.slots[index] ^ data != key or (data >> 32) & 0xFF < depth:
+            return None
+        return (data >> 32) & 0xFF, (data & 0xFFFFFFFF) - _SCORE_OFFSET, (data >> 40) & 3, (data >> 42) & 0xFFFF
+
+    def store(self, key, value, depth=0):
+        """Store a (depth, score, bound, move) entry for key, following the replacement policy."""
+        index = (key & self.mask) << 1
+        slots = self.slots
+        generation = slots[self._generation_index]
+        stored = slots[index + 1]
+        if (stored and slots[index] ^ stored != key and stored >> 58 == generation
+                and (stored >> 32) & 0xFF > depth):
+            return
+        entry_depth, score, bound, move = value
+        data = ((score + _SCORE_OFFSET) | min(entry_depth, 0xFF) << 32 | bound << 40 | move << 42
+                | generation << 58)
+        slots[index] = key ^ data
+        slots[index + 1] = data
+
+    def new_generation(self):
+        """Age every stored entry so that new results may replace them.
+
+        Helpers call it at the start of every search too; only the owner's call
+        counts, so the generation moves once per search.
+        """
+        if self.owner:
+            slots = self.slots
+            slots[self._generation_index] = (slots[self._generation_index] + 1) & 0x3F
+
+    def clear(self):
+        """Remove every entry and reset the generation, for every process sharing the table."""
+        self.memory.buf[:] = bytes(len(self.memory.buf))
+
+    def close(self, unlink=False):
+        """Detach from the shared memory, and free it when unlink is True."""
+        self.slots.release()
+        self.memory.close()
+        if unlink:
+            self.memory.unlink()
+
+
+def _helper_main(table_name, size_bits, seed, tasks, results, stop, tablebase_dir):
+    # Helper process: search every position it is sent until it receives None
+    table = SharedTranspositionTable(size_bits, table_name)
+    tablebases = Tablebases(tablebase_dir) if tablebase_dir is not None else None
+    searcher = Searcher(table=table, seed=seed, tablebases=tablebases)
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            search_id, fen, time_limit, max_depth = task
+            result = searcher.search(Position.from_fen(fen), time_limit, max_depth, stop)
+            results.put((search_id, seed, result.move, result.score, result.depth, result.nodes))
+    finally:
+        table.close()
+        if tablebases is not None:
+            tablebases.close()
+
+
+class ParallelSearcher:
+    """Search with the current process plus workers - 1 helper processes sharing one table.
+
+    The helpers are started once and reused for every search; call close() (or
+    use the searcher as a context manager) to stop them. Every process maps the
+    endgame tables of tablebase_dir, when given.
+    """
+
+    def __init__(self, workers=None, table_bits=20, tablebase_dir=None):
+        self.workers = workers or multiprocessing.cpu_count()
+        self.table = SharedTranspositionTable(table_bits)
+        self.tablebases = Tablebases(tablebase_dir) if tablebase_dir is not None else None
+        self.searcher = Searcher(table=self.table, tablebases=self.tablebases)
+        self.stop = multiprocessing.Event()
+        self.results = multiprocessing.Queue()
+        self.search_id = 0
+        self.helpers = {}  # seed -> (process, task queue)
+        for seed in range(1, self.workers):
+            tasks = multiprocessing.Queue()
+            process = multiprocessing.Process(
+                target=_helper_main,
+                args=(self.table.name, table_bits, seed, tasks, self.results, self.stop, tablebase_dir),
+                daemon=True,
+            )
+            process.start()
+            self.helpers[seed] = (process, tasks)
+
+    def search(self, position, time_limit=1.0, max_depth=64):
+        """Search the position with every worker and return the best move of the deepest completed iteration.
+
+        The returned node count is the total of all workers. A helper that dies
+        or does not report in time is left out, so the search falls back to the
+        result of the current process.
+        """
+        self.stop.clear()
+        self.search_id += 1
+        fen = position.to_fen()
+        for _, tasks in self.helpers.values():
+            tasks.put((self.search_id, fen, time_limit, max_depth))
+        result = self.searcher.search(position, time_limit, max_depth)
+        # Once the main search is done the helpers have nothing left to contribute
+        self.stop.set()
+        pending = set(self.helpers)
+        deadline = time.monotonic() + HELPER_GRACE
+        while pending:
+            try:
+                search_id, seed, move, score, depth, nodes = self.results.get(timeout=RESULT_POLL)
+            except queue.Empty:
+                for dead in [seed for seed in pending if not self.helpers[seed][0].is_alive()]:
+                    logger.warning("Search helper %d exited with code %s, continuing without it",
+                                   dead, self.helpers[dead][0].exitcode)
+                    pending.discard(dead)
+                    del self.helpers[dead]
+                if pending and time.monotonic() > deadline:
+                    logger.warning("Search helpers %s did not report in time", sorted(pending))
+                    break
+                continue
+            if search_id != self.search_id:
+                continue  # Late answer to a search that was given up on
+            pending.discard(seed)
+            result.nodes += nodes
+            if depth > result.depth and move is not None:
+                result.move, result.score, result.depth = move, score, depth
+        return result
+
+    def close(self):
+        """Stop the helper processes and free the shared table."""
+        for _, tasks in self.helpers.values():
+            tasks.put(None)
+        for process, _ in self.helpers.values():
+            process.join(HELPER_GRACE)
+            if process.is_alive():
+                process.terminate()
+        self.helpers = {}
+        self.table.close(unlink=True)
+        if self.tablebases is not None:
+            self.tablebases.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
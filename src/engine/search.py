@@ -0,0 +1,261 @@
+# --- Recherche ---
+# Negamax alpha-beta with iterative deepening, a transposition table, quiescence
+# search on captures and a hard time budget per move.
+import random
+import time
+
+from rules.instrument import timed
+from rules.movegen import generate_legal_moves
+from rules.position import EMPTY, EN_PASSANT, PROMOTION, QUEEN, move_promotion
+from rules.tablebase import LOSS, WIN
+from rules.transposition import TranspositionTable
+
+from .evaluate import PIECE_VALUES, evaluate
+
+MATE = 100000
+INFINITY = 1000000
+MAX_PLY = 128
+CHECK_INTERVAL = 256  # Nodes between two looks at the clock
+
+# Transposition table bounds
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time budget is spent."""
+
+
+class SearchResult:
+    """Best move of the deepest completed iteration and the search statistics."""
+
+    __slots__ = ('move', 'score', 'depth', 'nodes', 'elapsed')
+
+    def __init__(self, move=None, score=0, depth=0, nodes=0, elapsed=0.0):
+        self.move = move  # 16-bit move, or None when there is no legal move
+        self.score = score  # Centipawns for the side to move
+        self.depth = depth
+        self.nodes = nodes
+        self.elapsed = elapsed
+
+    @property
+    def nps(self):
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def _score_to_table(score, ply):
+    # Mate scores are stored relative to the node, not to the root
+    if score > MATE - MAX_PLY:
+        return score + ply
+    if score < -MATE + MAX_PLY:
+        return score - ply
+    return score
+
+
+def _score_from_table(score, ply):
+    if score > MATE - MAX_PLY:
+        return score - ply
+    if score < -MATE + MAX_PLY:
+        return score + ply
+    return score
+
+
+def _tablebase_score(entry, ply):
+    result, plies = entry
+    if result == WIN:
+        return MATE - ply - plies
+    if result == LOSS:
+        return -MATE + ply + plies
+    return 0
+
+
+class Searcher:
+    """Alpha-beta searcher keeping its transposition table between moves.
+
+    table may be any object with the TranspositionTable probe/store/new_generation
+    interface (e.g. a table shared between processes). A seed shuffles the root
+    moves, so that searchers sharing a table explore the tree in different orders.
+    With endgame tablebases, positions they cover are scored exactly instead of
+    searched, and the root move is taken from them.
+    """
+
+    def __init__(self, table_bits=18, table=None, seed=None, tablebases=None):
+        self.table = table if table is not None else TranspositionTable(table_bits)
+        self.tablebases = tablebases
+        self.rng = random.Random(seed) if seed is not None else None
+        self.nodes = 0
+        self.deadline = 0.0
+        self.stop = None
+        self.killers = [[0, 0] for _ in range(MAX_PLY)]
+        self.history = {}
+
+    @timed()
+    def search(self, position, time_limit=1.0, max_depth=64, stop=None):
+        """Search the position for at most time_limit seconds and return a SearchResult.
+
+        The search also ends as soon as the optional stop event is set. The
+        position is searched in place and restored before returning.
+        """
+        start = time.perf_counter()
+        self.deadline = start + time_limit
+        self.stop = stop
+        self.nodes = 0
+        self.killers = [[0, 0] for _ in range(MAX_PLY)]
+        self.history = {}
+        self.table.new_generation()
+        root_moves = generate_legal_moves(position)
+        result = SearchResult()
+        if not root_moves:
+            return result
+        if self.tablebases is not None:
+            entry = self.tablebases.probe(position)
+            if entry is not None:
+                result.move = self.tablebases.best_move(position)
+                result.score = _tablebase_score(entry, 0)
+                result.elapsed = time.perf_counter() - start
+                return result
+        if self.rng is not None:
+            self.rng.shuffle(root_moves)
+        result.move = root_moves[0]
+        undo_depth = len(position.undo_stack)
+        for depth in range(1, min(max_depth, MAX_PLY - 1) + 1):
+            try:
+                score, move = self._search_root(position, root_moves, depth)
+            except SearchTimeout:
+                while len(position.undo_stack) > undo_depth:
+                    position.unmake_move()
+                break
+            result.move, result.score, result.depth = move, score, depth
+            # Search the best move first in the next iteration
+            root_moves.remove(move)
+            root_moves.insert(0, move)
+            elapsed = time.perf_counter() - start
+            if abs(score) > MATE - MAX_PLY or elapsed > time_limit / 2:
+                # A forced mate will not change, and the next iteration would not finish in time
+                break
+        result.nodes = self.nodes
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def _check_time(self):
+        self.nodes += 1
+        if self.nodes % CHECK_INTERVAL == 0 and (time.perf_counter() > self.deadline
+                                                 or self.stop is not None and self.stop.is_set()):
+            raise SearchTimeout
+
+    def _search_root(self, position, moves, depth):
+        alpha, best_move = -INFINITY, moves[0]
+        for move in moves:
+            position.make_move(move)
+            score = -self._negamax(position, depth - 1, -INFINITY, -alpha, 1)
+            position.unmake_move()
+            if score > alpha:
+                alpha, best_move = score, move
+        self.table.store(position.key, (depth, alpha, EXACT, best_move), depth)
+        return alpha, best_move
+
+    def _negamax(self, position, depth, alpha, beta, ply):
+        in_check = position.in_check()
+        if in_check:
+            depth += 1  # Do not stop the search in the middle of a check sequence
+        if depth <= 0:
+            return self._quiescence(position, alpha, beta, ply)
+        self._check_time()
+
+        tablebases = self.tablebases
+        if tablebases is not None and bin(position.occupied).count('1') <= tablebases.max_pieces:
+            entry = tablebases.probe(position)
+            if entry is not None:
+                return _tablebase_score(entry, ply)
+
+        key = position.key
+        entry = self.table.probe(key)
+        table_move = 0
+        if entry is not None:
+            entry_depth, score, bound, table_move = entry
+            if entry_depth >= depth:
+                score = _score_from_table(score, ply)
+                if bound == EXACT or (bound == LOWER and score >= beta) or (bound == UPPER and score <= alpha):
+                    return score
+
+        moves = generate_legal_moves(position)
+        if not moves:
+            return -MATE + ply if in_check else 0
+        if ply >= MAX_PLY - 1:
+            return evaluate(position)
+
+        original_alpha = alpha
+        best_score, best_move = -INFINITY, 0
+        for move in self._order_moves(position, moves, table_move, ply):
+            position.make_move(move)
+            score = -self._negamax(position, depth - 1, -beta, -alpha, ply + 1)
+            position.unmake_move()
+            if score > best_score:
+                best_score, best_move = score, move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        if position.squares[(move >> 6) & 63] == EMPTY and move >> 14 not in (EN_PASSANT, PROMOTION):
+                            # Quiet moves that refute a position are tried early in its siblings
+                            killers = self.killers[ply]
+                            if killers[0] != move:
+                                killers[1], killers[0] = killers[0], move
+                            self.history[move] = self.history.get(move, 0) + depth * depth
+                        break
+
+        if best_score <= original_alpha:
+            bound = UPPER
+        elif best_score >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.table.store(key, (depth, _score_to_table(best_score, ply), bound, best_move), depth)
+        return best_score
+
+    def _quiescence(self, position, alpha, beta, ply):
+        # Only captures and queen promotions are searched, so the score is taken on a quiet position
+        self._check_time()
+        stand_pat = evaluate(position)
+        if stand_pat >= beta or ply >= MAX_PLY - 1:
+            return stand_pat
+        if stand_pat > alpha:
+            alpha = stand_pat
+        squares = position.squares
+        captures = [
+            move for move in generate_legal_moves(position, captures_only=True)
+            if move >> 14 != PROMOTION or move_promotion(move) == QUEEN
+        ]
+        captures.sort(key=lambda move: self._capture_score(squares, move), reverse=True)
+        for move in captures:
+            position.make_move(move)
+            score = -self._quiescence(position, -beta, -alpha, ply + 1)
+            position.unmake_move()
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+        return alpha
+
+    @staticmethod
+    def _capture_score(squares, move):
+        # Most valuable victim first, then least valuable attacker
+        victim = squares[(move >> 6) & 63]
+        value = PIECE_VALUES[victim % 6] if victim != EMPTY else PIECE_VALUES[0]
+        if move >> 14 == PROMOTION:
+            value += PIECE_VALUES[move_promotion(move)]
+        return value * 10 - PIECE_VALUES[squares[move & 63] % 6] // 100
+
+    def _order_moves(self, position, moves, table_move, ply):
+        squares = position.squares
+        killers = self.killers[ply]
+        history = self.history
+
+        def priority(move):
+            if move == table_move:
+                return 3 * INFINITY
+            if squares[(move >> 6) & 63] != EMPTY or move >> 14 in (EN_PASSANT, PROMOTION):
+                return 2 * INFINITY + self._capture_score(squares, move)
+            if move == killers[0] or move == killers[1]:
+                return INFINITY
+            return history.get(move, 0)
+
+        return sorted(moves, key=priority, reverse=True)
@@ -0,0 +1,114 @@
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import sys
+import time
+
+from server import DEFAULT_HOST, DEFAULT_PORT, MAX_LINE, ONGOING
+
+
+class Connection:
+    """One client connection carrying the requests of many games; replies are matched by request id."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.ids = itertools.count(1)
+        self.pending = {}
+        self.listener = asyncio.create_task(self._listen())
+
+    @classmethod
+    async def open(cls, host, port):
+        reader, writer = await asyncio.open_connection(host, port, limit=MAX_LINE * 16)
+        return cls(reader, writer)
+
+    async def _listen(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            reply = json.loads(line)
+            self.pending.pop(reply["id"]).set_result(reply)
+        for future in self.pending.values():
+            future.set_exception(ConnectionError("the server closed the connection"))
+
+    async def request(self, **request):
+        request["id"] = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request["id"]] = future
+        self.writer.write(json.dumps(request).encode() + b"\n")
+        await self.writer.drain()
+        return await future
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        self.listener.cancel()
+
+
+async def play_game(connection, max_moves, latencies, rng):
+    """Play random legal moves in one game and record the round trip of every move."""
+    reply = await connection.request(op="new", legal=True)
+    game = reply["game"]
+    for _ in range(max_moves):
+        if reply["result"] != ONGOING:
+            break
+        start = time.perf_counter()
+        reply = await connection.request(op="move", game=game, move=rng.choice(reply["moves"]), legal=True)
+        latencies.append(time.perf_counter() - start)
+        if not reply["ok"]:
+            raise RuntimeError(f"game {game}: {reply['error']}")
+    await connection.request(op="close", game=game)
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def run(host, port, games, connections, max_moves, seed):
+    rng = random.Random(seed)
+    clients = [await Connection.open(host, port) for _ in range(connections)]
+    latencies = []
+    start = time.perf_counter()
+    # Every game runs at once; the games share the connections round robin
+    await asyncio.gather(*(play_game(clients[index % connections], max_moves, latencies, rng)
+                           for index in range(games)))
+    elapsed = time.perf_counter() - start
+    for client in clients:
+        await client.close()
+    return latencies, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play many simultaneous random games against server.py "
+                                                 "and report moves/second and move latency.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"server address (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"server port (default: {DEFAULT_PORT})")
+    parser.add_argument("--games", type=int, default=1000, help="simultaneous games (default: 1000)")
+    parser.add_argument("--connections", type=int, default=50,
+                        help="connections the games are spread over (default: 50)")
+    parser.add_argument("--moves", type=int, default=40, help="moves played at most per game (default: 40)")
+    parser.add_argument("--seed", type=int, help="random seed, for repeatable games")
+    args = parser.parse_args(argv)
+
+    try:
+        latencies, elapsed = asyncio.run(run(args.host, args.port, args.games, min(args.connections, args.games),
+                                             args.moves, args.seed))
+    except (OSError, RuntimeError) as error:
+        print(f"loadgen: {error}", file=sys.stderr)
+        return 1
+    if not latencies:
+        print("no move played", file=sys.stderr)
+        return 1
+    latencies.sort()
+    print(f"{args.games} games over {args.connections} connections: {len(latencies)} moves in {elapsed:.2f}s, "
+          f"{len(latencies) / elapsed:.0f} moves/s", file=sys.stderr)
+    print(f"move latency: p50 {percentile(latencies, 0.5) * 1000:.1f} ms  p99 {percentile(latencies, 0.99) * 1000:.1f} ms  "
+          f"max {latencies[-1] * 1000:.1f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+import argparse
+import logging
+import os
+import sys
+import time
+
+from rules.archive import ArchiveWriter, GameArchive
+from rules.pgn import IllegalMoveError, read_games
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Store the games of a PGN file in a compact binary archive.")
+    parser.add_argument("pgn", help="PGN file to read the games from")
+    parser.add_argument("archive", help="archive file to write")
+    parser.add_argument("--encoding", default="utf-8", help="encoding of the PGN file (default: utf-8)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+
+    start = time.perf_counter()
+    skipped = 0
+    with open(args.pgn, encoding=args.encoding, errors="replace") as pgn, ArchiveWriter(args.archive) as archive:
+        for game in read_games(pgn):
+            try:
+                archive.add_game(game)
+            except IllegalMoveError as error:
+                skipped += 1
+                logger.warning("Game at line %d left out: ply %s, %s", game.line, error.ply, error)
+            except ValueError as error:
+                skipped += 1
+                logger.warning("Game at line %d left out: %s", game.line, error)
+    elapsed = time.perf_counter() - start
+    size, pgn_size = os.path.getsize(args.archive), os.path.getsize(args.pgn)
+    print(f"{len(archive)} games written to {args.archive} ({skipped} left out)  {elapsed:.3f}s  "
+          f"{size} bytes, {100 * size / max(pgn_size, 1):.1f}% of the PGN", file=sys.stderr)
+
+    # Rebuild the final position of every game, as a check and a measure of the replay speed
+    start = time.perf_counter()
+    plies = 0
+    with GameArchive(args.archive) as archive:
+        for number in range(len(archive)):
+            archive.position(number)
+            plies += len(archive.moves(number))
+    elapsed = time.perf_counter() - start
+    print(f"replayed {plies} moves in {elapsed:.3f}s  {plies / elapsed if elapsed > 0 else 0.0:.0f} moves/s",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
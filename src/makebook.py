@@ -0,0 +1,37 @@
+import argparse
+import sys
+import time
+
+from engine.book import DEFAULT_BOOK_PLIES, OpeningBook, build_book, write_book
+from rules.fen import START_FEN
+from rules.pgn import read_games
+from rules.position import Position, move_to_uci
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build an opening book from the first moves of PGN games.")
+    parser.add_argument("pgn", help="PGN file to read the games from")
+    parser.add_argument("book", help="opening book file to write")
+    parser.add_argument("--plies", type=int, default=DEFAULT_BOOK_PLIES,
+                        help=f"half-moves of every game to record (default: {DEFAULT_BOOK_PLIES})")
+    parser.add_argument("--min-games", type=int, default=1,
+                        help="leave out moves played in fewer games (default: 1)")
+    parser.add_argument("--encoding", default="utf-8", help="encoding of the PGN file (default: utf-8)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    with open(args.pgn, encoding=args.encoding, errors="replace") as pgn:
+        entries = build_book(read_games(pgn), args.plies, args.min_games)
+    records = write_book(args.book, entries)
+    elapsed = time.perf_counter() - start
+    print(f"{records} book moves written to {args.book}  {elapsed:.3f}s", file=sys.stderr)
+    with OpeningBook(args.book) as book:
+        moves = book.moves(Position.from_fen(START_FEN))
+    if moves:
+        print("initial position: " + ", ".join(f"{move_to_uci(move)} ({weight})" for move, weight in moves),
+              file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
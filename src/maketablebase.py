@@ -0,0 +1,44 @@
+import argparse
+import os
+import sys
+import time
+
+from rules.tablebase import EXTENSION, check_material, generate_table, material_name, write_table
+
+DEFAULT_MATERIAL = ("KQK", "KRK", "KPK")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate endgame tables by retrograde analysis.")
+    parser.add_argument("material", nargs="*", default=DEFAULT_MATERIAL,
+                        help=f"material sets, white pieces first (default: {' '.join(DEFAULT_MATERIAL)})")
+    parser.add_argument("--output", default="tablebases", help="directory to write the tables to (default: tablebases)")
+    args = parser.parse_args(argv)
+    try:
+        names = [material_name(check_material(material)) for material in args.material]
+    except ValueError as error:
+        parser.error(str(error))
+
+    os.makedirs(args.output, exist_ok=True)
+    # Tables already written are reused for the captures and promotions of the next ones
+    tables = {}
+    for file_name in os.listdir(args.output):
+        if file_name.endswith(EXTENSION):
+            with open(os.path.join(args.output, file_name), "rb") as table:
+                tables[file_name[:-len(EXTENSION)]] = table.read()
+    for name in names:
+        if name in tables:
+            print(f"{name}: already in {args.output}", file=sys.stderr)
+            continue
+        start = time.perf_counter()
+        known = set(tables)
+        tables[name] = generate_table(name, tables)
+        for generated in [name] + sorted(set(tables) - known - {name}):
+            path = write_table(args.output, generated, tables[generated])
+            print(f"{generated}: {path}", file=sys.stderr)
+        print(f"{name}: {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+import argparse
+import sys
+import time
+
+from rules.fen import START_FEN
+from rules.movegen import generate_legal_moves
+from rules.position import Position, move_to_uci
+
+# (name, FEN, known leaf counts for depth 1, 2, ...)
+SUITE = [
+    ("start", START_FEN, [20, 400, 8902, 197281, 4865609, 119060324]),
+    ("kiwipete", "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+     [48, 2039, 97862, 4085603, 193690690]),
+    ("rook endgame", "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", [14, 191, 2812, 43238, 674624, 11030083]),
+    ("promotions", "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+     [6, 264, 9467, 422333, 15833292]),
+    ("discovered promotion", "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+     [44, 1486, 62379, 2103487, 89941194]),
+    ("middlegame", "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+     [46, 2079, 89890, 3894594]),
+    ("illegal en passant 1", "3k4/3p4/8/K1P4r/8/8/8/8 b - - 0 1", [18, 92, 1670, 10138, 185429, 1134888]),
+    ("illegal en passant 2", "8/8/4k3/8/2p5/8/B2P2K1/8 w - - 0 1", [13, 102, 1266, 10276, 135655, 1015133]),
+    ("en passant gives check", "8/8/1k6/2b5/2pP4/8/5K2/8 b - d3 0 1", [15, 126, 1928, 13931, 206379, 1440467]),
+    ("short castling gives check", "5k2/8/8/8/8/8/8/4K2R w K - 0 1", [15, 66, 1198, 6399, 120330, 661072]),
+    ("long castling gives check", "3k4/8/8/8/8/8/8/R3K3 w Q - 0 1", [16, 71, 1286, 7418, 141077, 803711]),
+    ("castling rights", "r3k2r/1b4bq/8/8/8/8/7B/R3K2R w KQkq - 0 1", [26, 1141, 27826, 1274206]),
+    ("castling prevented", "r3k2r/8/3Q4/8/8/5q2/8/R3K2R b KQkq - 0 1", [44, 1494, 50509, 1720476]),
+    ("promote out of check", "2K2r2/4P3/8/8/8/8/8/3k4 w - - 0 1", [11, 133, 1442, 19174, 266199, 3821001]),
+    ("discovered check", "8/8/1P2K3/8/2n5/1q6/8/5k2 b - - 0 1", [29, 165, 5160, 31961, 1004658]),
+    ("promote to give check", "4k3/1P6/8/8/8/8/K7/8 w - - 0 1", [9, 40, 472, 2661, 38983, 217342]),
+    ("underpromote to give check", "8/P1k5/K7/8/8/8/8/8 w - - 0 1", [6, 27, 273, 1329, 18135, 92683]),
+    ("self stalemate", "K1k5/8/P7/8/8/8/8/8 w - - 0 1", [2, 6, 13, 63, 382, 2217]),
+    ("stalemate and checkmate 1", "8/k1P5/8/1K6/8/8/8/8 w - - 0 1", [10, 25, 268, 926, 10857, 43261, 567584]),
+    ("stalemate and checkmate 2", "8/8/2k5/5q2/5n2/8/5K2/8 b - - 0 1", [37, 183, 6559, 23527]),
+]
+
+
+def perft(position, depth):
+    """Count the leaf nodes of the legal move tree to the given depth."""
+    moves = generate_legal_moves(position)
+    if depth <= 1:
+        return len(moves) if depth == 1 else 1
+    nodes = 0
+    for move in moves:
+        position.make_move(move)
+        nodes += perft(position, depth - 1)
+        position.unmake_move()
+    return nodes
+
+
+def divide(position, depth):
+    """Return (move, leaf count) for every legal move of the position."""
+    results = []
+    for move in generate_legal_moves(position):
+        position.make_move(move)
+        results.append((move, perft(position, depth - 1)))
+        position.unmake_move()
+    return results
+
+
+def run_perft(name, fen, depth, expected=None, show_divide=False):
+    """Run perft on one position, print the result line and return the node count it measured."""
+    position = Position.from_fen(fen)
+    start = time.perf_counter()
+    if show_divide:
+        results = divide(position, depth)
+        for move, count in sorted(results, key=lambda item: move_to_uci(item[0])):
+            print(f"  {move_to_uci(move)}: {count}")
+        nodes = sum(count for _, count in results)
+    else:
+        nodes = perft(position, depth)
+    elapsed = time.perf_counter() - start
+    nps = nodes / elapsed if elapsed > 0 else 0.0
+    if expected is None:
+        status = ""
+    else:
+        status = "OK" if nodes == expected else f"FAIL (expected {expected})"
+    print(f"{name:<28} depth {depth}  nodes {nodes:>10}  {elapsed:8.3f}s  {nps:>10.0f} nps  {status}")
+    return nodes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Count move-generation leaf nodes (perft) and report nodes/second.")
+    parser.add_argument("--fen", help="position to search (default: the reference suite)")
+    parser.add_argument("--depth", type=int, default=3, help="search depth (default: 3)")
+    parser.add_argument("--divide", action="store_true", help="print the node count below every root move")
+    parser.add_argument("--expected", type=int, help="known node count to check a --fen run against")
+    args = parser.parse_args(argv)
+
+    if args.fen:
+        nodes = run_perft("custom", args.fen, args.depth, args.expected, args.divide)
+        ok = args.expected is None or nodes == args.expected
+    else:
+        failures = total_nodes = 0
+        start = time.perf_counter()
+        for name, fen, counts in SUITE:
+            # Positions with fewer known depths are run to their deepest reference count
+            depth = min(args.depth, len(counts))
+            nodes = run_perft(name, fen, depth, counts[depth - 1], args.divide)
+            failures += nodes != counts[depth - 1]
+            total_nodes += nodes
+        elapsed = time.perf_counter() - start
+        print(f"total nodes {total_nodes}  {elapsed:.3f}s  {total_nodes / elapsed if elapsed > 0 else 0.0:.0f} nps"
+              + (f"  {failures} FAILED" if failures else ""))
+        ok = not failures
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+import pygame
+
+from board import (
+    CHECK_COLOR, GRAY, HIGHLIGHT, POSSIBLE_MOVE_COLOR, SQUARE_SIZE, WHITE, draw_checkmate_message, draw_draw_message,
+    draw_piece, draw_square, draw_stalemate_message,
+)
+from rules.instrument import timed
+
+
+class BoardRenderer:
+    """Draw the board from a pre-rendered background and push only the squares that changed."""
+
+    def __init__(self, screen, pieces):
+        self.screen = screen
+        self.pieces = pieces
+        self.background = render_background()
+        # What each square currently shows: (piece, selected, possible move, king in check)
+        self.square_states = [None] * 64
+        self.full_redraw = True
+
+    def invalidate(self):
+        """Redraw and flip the whole board on the next frame (e.g. after an overlay was shown)."""
+        self.full_redraw = True
+
+    @timed()
+    def render(self, game_state, status):
+        """Redraw the squares whose contents changed and return their rectangles."""
+        selected_piece = game_state.selected
+        possible_moves = status.possible_moves(selected_piece)
+        king_pos = status.king_pos
+        squares = game_state.squares
+        states = self.square_states
+        full_redraw = self.full_redraw
+        dirty = []
+        for index in range(64):
+            pos = divmod(index, 8)
+            # Piece letters stay as ASCII codes until a square actually has to be drawn
+            state = (squares[index], pos == selected_piece, pos in possible_moves, pos == king_pos)
+            if full_redraw or state != states[index]:
+                states[index] = state
+                dirty.append(self.draw_square_state(pos[0], pos[1], state))
+        if full_redraw:
+            self.full_redraw = False
+            pygame.display.flip()
+        elif dirty:
+            pygame.display.update(dirty)
+        return dirty
+
+    def draw_square_state(self, row, col, state):
+        """Draw one square from the background plus its overlays and return its rectangle."""
+        code, selected, possible_move, in_check = state
+        rect = pygame.Rect(col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE)
+        self.screen.blit(self.background, rect, rect)
+        if in_check:
+            draw_square(self.screen, row, col, CHECK_COLOR)
+        if selected:
+            draw_square(self.screen, row, col, HIGHLIGHT)
+        if possible_move:
+            pygame.draw.circle(self.screen, POSSIBLE_MOVE_COLOR, rect.center, SQUARE_SIZE // 4)
+        draw_piece(self.screen, chr(code), self.pieces, row, col)
+        return rect
+
+    def render_game_over(self, status, white_turn):
+        """Show the checkmate, stalemate or draw message over the board."""
+        if status.checkmate:
+            draw_checkmate_message(self.screen, white_turn)
+        elif status.stalemate:
+            draw_stalemate_message(self.screen)
+        elif status.draw:
+            draw_draw_message(self.screen, status.draw)
+        else:
+            return
+        pygame.display.flip()
+        self.full_redraw = True  # The message covers squares that are not tracked
+
+
+def render_background():
+    """Render the empty checkered board once."""
+    background = pygame.Surface((SQUARE_SIZE * 8, SQUARE_SIZE * 8)).convert()
+    for row in range(8):
+        for col in range(8):
+            draw_square(background, row, col, WHITE if (row + col) % 2 == 0 else GRAY)
+    return background
@@ -0,0 +1,22 @@
+"""Chess rules without any display dependency.
+
+Position, move generation, move application, game-status detection and FEN/PGN
+reading can be imported from here by batch tools and servers that have no
+pygame installed. The NumPy batch evaluation lives in rules.batch and is
+imported separately, so that NumPy stays optional.
+"""
+from .fen import START_FEN, board_from_fen, board_to_fen
+from .game import get_possible_moves, init_board, is_checkmate, is_stalemate, play_move
+from .movegen import generate_legal_moves, legal_moves
+from .moves import is_king_in_check, is_valid_move
+from .pgn import IllegalMoveError, PgnGame, parse_san, read_games, replay_game
+from .position import Position
+from .state import GameState
+from .status import GameStatus, GameStatusCache
+
+__all__ = [
+    'START_FEN', 'GameState', 'GameStatus', 'GameStatusCache', 'IllegalMoveError', 'PgnGame', 'Position',
+    'board_from_fen', 'board_to_fen', 'generate_legal_moves', 'get_possible_moves', 'init_board', 'is_checkmate',
+    'is_king_in_check', 'is_stalemate', 'is_valid_move', 'legal_moves', 'parse_san', 'play_move', 'read_games',
+    'replay_game',
+]
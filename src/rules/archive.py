@@ -0,0 +1,178 @@
+# --- Archive de parties ---
+# Binary archive of finished games. Every move takes 2 bytes: the 16-bit moves
+# of rules.position (from square, to square, promotion piece and a flag that
+# marks castling and en passant). The file starts with a header giving the
+# number of games and the offset of the index, an array of 8-byte record
+# offsets, so game N is found in constant time in the memory-mapped file.
+#
+#   header  magic, version, game count, index offset
+#   games   result, tag length, tags, moves (big-endian 16-bit each)
+#   index   offset of every game record, then the end of the last one
+import mmap
+import struct
+from array import array
+
+from .fen import START_FEN, validate_position
+from .pgn import RESULTS, IllegalMoveError, parse_san
+from .position import Position
+
+MAGIC = b'PCGA'
+VERSION = 1
+HEADER = struct.Struct('>4sB3xQQ')
+GAME = struct.Struct('>BH')  # Result (index in RESULTS) and length of the tag pairs
+_OFFSET = struct.Struct('>Q')
+_TAG_SEPARATOR = b'\0'
+
+
+def _encode_headers(headers):
+    data = _TAG_SEPARATOR.join(part.encode('utf-8') for item in headers.items() for part in item)
+    if len(data) > 0xFFFF:
+        raise ValueError(f"tag pairs too long for the archive ({len(data)} bytes)")
+    return data
+
+
+def _decode_headers(data):
+    if not data:
+        return {}
+    parts = data.decode('utf-8').split('\0')
+    return dict(zip(parts[::2], parts[1::2]))
+
+
+class ArchiveWriter:
+    """Write games one at a time to a new archive; only the record offsets are kept in memory.
+
+    Use it as a context manager, or call close() to write the index.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, 0, 0))
+        self.offsets = array('Q')
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def add(self, moves, result='*', headers=None):
+        """Append a game given as 16-bit moves, which are stored without being checked."""
+        tags = _encode_headers(headers or {})
+        self.offsets.append(self.file.tell())
+        self.file.write(GAME.pack(RESULTS.index(result), len(tags)))
+        self.file.write(tags)
+        self.file.write(struct.pack(f'>{len(moves)}H', *moves))
+
+    def add_game(self, game):
+        """Append a PgnGame, checking every SAN move against the rules.
+
+        Raises IllegalMoveError at the first move that cannot be played, or
+        ValueError if the starting FEN is invalid; nothing is written then.
+        """
+        position = game.start_position()
+        moves = []
+        for ply, san in enumerate(game.moves, 1):
+            try:
+                move = parse_san(position, san)
+            except IllegalMoveError as error:
+                error.ply = ply
+                error.fen = position.to_fen()
+                raise
+            position.make_move(move)
+            moves.append(move)
+        self.add(moves, game.result, game.headers)
+
+    def close(self):
+        if self.file.closed:
+            return
+        index_offset = self.file.tell()
+        self.offsets.append(index_offset)  # End of the last record, so every record has a length
+        self.file.write(b''.join(_OFFSET.pack(offset) for offset in self.offsets))
+        self.offsets.pop()
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, len(self.offsets), index_offset))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class GameArchive:
+    """Read-only game archive mapped in memory; games are numbered from 0.
+
+    Use it as a context manager, or call close() once it is no longer needed.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise ValueError(f"{path} is not a game archive: the file is empty") from None
+        if len(self.data) < HEADER.size:
+            self.close()
+            raise ValueError(f"{path} is not a game archive: the file is too short")
+        magic, version, self.count, self.index_offset = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a game archive of version {VERSION}")
+        if self.index_offset + (self.count + 1) * _OFFSET.size > len(self.data):
+            self.close()
+            raise ValueError(f"{path} is truncated")
+
+    def __len__(self):
+        return self.count
+
+    def _record(self, number):
+        # (result, tags, start and end offsets of the moves) of a game
+        if not 0 <= number < self.count:
+            raise IndexError(f"game {number} is not in the archive ({self.count} games)")
+        start, end = struct.unpack_from('>QQ', self.data, self.index_offset + number * _OFFSET.size)
+        result, tag_length = GAME.unpack_from(self.data, start)
+        tags_start = start + GAME.size
+        return result, tags_start, tags_start + tag_length, end
+
+    def result(self, number):
+        return RESULTS[self._record(number)[0]]
+
+    def headers(self, number):
+        """Return the tag pairs of a game as a dict."""
+        _, tags_start, moves_start, _ = self._record(number)
+        return _decode_headers(self.data[tags_start:moves_start])
+
+    def moves(self, number):
+        """Return the 16-bit moves of a game as a tuple."""
+        _, _, moves_start, end = self._record(number)
+        return struct.unpack_from(f'>{(end - moves_start) // 2}H', self.data, moves_start)
+
+    def start_position(self, number):
+        """Return the Position a game starts from (its FEN tag or the initial position)."""
+        fen = self.headers(number).get('FEN')
+        if fen is None:
+            return Position.from_fen(START_FEN)
+        position = Position.from_fen(fen)
+        validate_position(position)
+        return position
+
+    def position(self, number, ply=None):
+        """Return the Position of a game after ply half-moves (all of them by default).
+
+        The moves were checked when the game was archived, so they are applied
+        directly, without generating the legal moves of every position.
+        """
+        position = self.start_position(number)
+        for move in self.moves(number)[:ply]:
+            position.make_move(move)
+        return position
+
+    def close(self):
+        if not self.data.closed:
+            self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,100 @@
+# --- Tables d'attaque ---
+# Attack sets of every piece from every square, built once at import time (a
+# few milliseconds) from the shift-based helpers of rules.bitboard, so that
+# legality, check and pin questions about one square are table lookups.
+# Sliding pieces use the eight rays of their square: a ray is cut at its first
+# blocker by removing the ray that continues behind it.
+from .bitboard import king_attacks, knight_attacks, pawn_attacks
+
+# Ray directions as (row step, col step). Square numbers grow along the first
+# four (towards row 7 or col 7) and shrink along the last four.
+SOUTH, EAST, SOUTH_EAST, SOUTH_WEST, NORTH, WEST, NORTH_WEST, NORTH_EAST = range(8)
+DIRECTIONS = ((1, 0), (0, 1), (1, 1), (1, -1), (-1, 0), (0, -1), (-1, -1), (-1, 1))
+ROOK_DIRECTIONS = (SOUTH, EAST, NORTH, WEST)
+BISHOP_DIRECTIONS = (SOUTH_EAST, SOUTH_WEST, NORTH_WEST, NORTH_EAST)
+
+
+def _ray(sq, direction):
+    row_step, col_step = DIRECTIONS[direction]
+    row, col = (sq >> 3) + row_step, (sq & 7) + col_step
+    ray = 0
+    while 0 <= row < 8 and 0 <= col < 8:
+        ray |= 1 << (row * 8 + col)
+        row, col = row + row_step, col + col_step
+    return ray
+
+
+KNIGHT_ATTACKS = [knight_attacks(1 << sq) for sq in range(64)]
+KING_ATTACKS = [king_attacks(1 << sq) for sq in range(64)]
+# Squares attacked by a pawn of each colour (WHITE, BLACK) standing on a square
+PAWN_ATTACKS = [[pawn_attacks(1 << sq, white) for sq in range(64)] for white in (True, False)]
+# RAYS[direction][sq]: the squares from sq to the edge of the board, sq excluded
+RAYS = [[_ray(sq, direction) for sq in range(64)] for direction in range(8)]
+# Attacks of a rook and a bishop on an empty board
+ROOK_RAYS = [RAYS[SOUTH][sq] | RAYS[EAST][sq] | RAYS[NORTH][sq] | RAYS[WEST][sq] for sq in range(64)]
+BISHOP_RAYS = [RAYS[SOUTH_EAST][sq] | RAYS[SOUTH_WEST][sq] | RAYS[NORTH_WEST][sq] | RAYS[NORTH_EAST][sq]
+               for sq in range(64)]
+
+
+def _between_table():
+    table = [[0] * 64 for _ in range(64)]
+    for sq in range(64):
+        for direction in range(8):
+            opposite = RAYS[direction ^ 4]
+            ray = RAYS[direction][sq]
+            remaining = ray
+            while remaining:
+                low = remaining & -remaining
+                other = low.bit_length() - 1
+                table[sq][other] = ray & opposite[other]
+                remaining ^= low
+    return table
+
+
+# BETWEEN[a][b]: the squares strictly between two squares on a common line, or 0
+BETWEEN = _between_table()
+
+_S, _E, _SE, _SW = RAYS[SOUTH], RAYS[EAST], RAYS[SOUTH_EAST], RAYS[SOUTH_WEST]
+_N, _W, _NW, _NE = RAYS[NORTH], RAYS[WEST], RAYS[NORTH_WEST], RAYS[NORTH_EAST]
+
+
+def rook_attacks_from(sq, occupied):
+    """Return the squares attacked by a rook on sq, stopping at the pieces of occupied."""
+    # Towards higher squares the first blocker is the lowest bit, towards lower squares the highest
+    attacks = 0
+    ray = _S[sq]
+    blockers = ray & occupied
+    attacks |= ray ^ _S[(blockers & -blockers).bit_length() - 1] if blockers else ray
+    ray = _E[sq]
+    blockers = ray & occupied
+    attacks |= ray ^ _E[(blockers & -blockers).bit_length() - 1] if blockers else ray
+    ray = _N[sq]
+    blockers = ray & occupied
+    attacks |= ray ^ _N[blockers.bit_length() - 1] if blockers else ray
+    ray = _W[sq]
+    blockers = ray & occupied
+    attacks |= ray ^ _W[blockers.bit_length() - 1] if blockers else ray
+    return attacks
+
+
+def bishop_attacks_from(sq, occupied):
+    """Return the squares attacked by a bishop on sq, stopping at the pieces of occupied."""
+    attacks = 0
+    ray = _SE[sq]
+    blockers = ray & occupied
+    attacks |= ray ^ _SE[(blockers & -blockers).bit_length() - 1] if blockers else ray
+    ray = _SW[sq]
+    blockers = ray & occupied
+    attacks |= ray ^ _SW[(blockers & -blockers).bit_length() - 1] if blockers else ray
+    ray = _NW[sq]
+    blockers = ray & occupied
+    attacks |= ray ^ _NW[blockers.bit_length() - 1] if blockers else ray
+    ray = _NE[sq]
+    blockers = ray & occupied
+    attacks |= ray ^ _NE[blockers.bit_length() - 1] if blockers else ray
+    return attacks
+
+
+def queen_attacks_from(sq, occupied):
+    """Return the squares attacked by a queen on sq, stopping at the pieces of occupied."""
+    return rook_attacks_from(sq, occupied) | bishop_attacks_from(sq, occupied)
@@ -0,0 +1,231 @@
+# --- Batch evaluation with NumPy ---
+# Evaluates many positions at once: every bitboard operation is applied to a
+# whole column of N positions instead of looping over them in Python.
+# Positions are packed as N x 64 int8 piece codes in the list-board square order
+# (square = row * 8 + col), using the Position piece indexes (0-11, -1 for empty).
+import numpy as np
+
+from .bitboard import FULL, NOT_A, NOT_AB, NOT_GH, NOT_H, ROW_MASKS
+from .position import EMPTY, PIECE_INDEX
+
+_FULL = np.uint64(FULL)
+_NOT_A = np.uint64(NOT_A)
+_NOT_H = np.uint64(NOT_H)
+_ROW_0 = np.uint64(ROW_MASKS[0])
+_ROW_5 = np.uint64(ROW_MASKS[5])
+
+# (shift, towards higher squares, mask) for each ray direction: orthogonal ones first
+_DIRECTIONS = [
+    (8, True, FULL), (8, False, FULL), (1, True, NOT_A), (1, False, NOT_H),
+    (9, True, NOT_A), (7, True, NOT_H), (7, False, NOT_A), (9, False, NOT_H),
+]
+_DIRECTIONS = [(np.uint64(shift), up, np.uint64(mask)) for shift, up, mask in _DIRECTIONS]
+_KNIGHT_STEPS = [
+    (17, True, NOT_A), (15, True, NOT_H), (10, True, NOT_AB), (6, True, NOT_GH),
+    (15, False, NOT_A), (17, False, NOT_H), (6, False, NOT_AB), (10, False, NOT_GH),
+]
+_KNIGHT_STEPS = [(np.uint64(shift), up, np.uint64(mask)) for shift, up, mask in _KNIGHT_STEPS]
+
+# Castling squares once black-to-move rows are mirrored: the king on e1 and rooks on a1 / h1
+_E1, _A1, _H1 = np.uint64(1 << 60), np.uint64(1 << 56), np.uint64(1 << 63)
+_KINGSIDE_EMPTY, _KINGSIDE_SAFE = np.uint64(6 << 60), np.uint64(7 << 60)
+_QUEENSIDE_EMPTY, _QUEENSIDE_SAFE = np.uint64(7 << 57), np.uint64(7 << 58)
+
+_CHAR_CODES = np.full(256, EMPTY, dtype=np.int8)
+for _char, _index in PIECE_INDEX.items():
+    _CHAR_CODES[ord(_char)] = _index
+
+if hasattr(np, 'bitwise_count'):
+    _popcount = np.bitwise_count
+else:
+    _BYTE_COUNTS = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+    def _popcount(bb):
+        return _BYTE_COUNTS[bb.view(np.uint8)].reshape(bb.shape + (8,)).sum(axis=-1, dtype=np.uint8)
+
+
+def pack_boards(boards):
+    """Pack 8x8 list boards (as returned by init_board) into an N x 64 int8 array of piece codes."""
+    text = ''.join(char for board in boards for row in board for char in row)
+    return _CHAR_CODES[np.frombuffer(text.encode('latin-1'), dtype=np.uint8)].reshape(-1, 64)
+
+
+def pack_positions(positions):
+    """Pack Position objects into (codes, white_turn, castling, ep_squares) arrays for evaluate."""
+    positions = list(positions)
+    codes = np.array([position.squares for position in positions], dtype=np.int8).reshape(-1, 64)
+    white_turn = np.array([position.white_turn for position in positions], dtype=bool)
+    castling = np.array([position.castling for position in positions], dtype=np.int64)
+    ep_squares = np.array([-1 if position.ep_square is None else position.ep_square for position in positions],
+                          dtype=np.int64)
+    return codes, white_turn, castling, ep_squares
+
+
+def piece_bitboards(codes):
+    """Return the N x 12 uint64 piece bitboards of packed positions, indexed like Position.pieces."""
+    codes = np.asarray(codes, dtype=np.int8).reshape(-1, 64)
+    pieces = np.empty((len(codes), 12), dtype=np.uint64)
+    for piece in range(12):
+        # Square 0 becomes bit 0 once the 8 packed bytes are read as a little-endian uint64
+        pieces[:, piece] = np.packbits(codes == piece, axis=1, bitorder='little').view('<u8')[:, 0]
+    return pieces
+
+
+def _step(bb, step):
+    shift, up, mask = step
+    return ((bb << shift) if up else (bb >> shift)) & mask
+
+
+def _ray(bb, empty, step):
+    # Slide every piece of bb one direction at once until the rays leave the board or hit a blocker
+    shift, up, mask = step
+    move = np.left_shift if up else np.right_shift
+    bb = move(bb, shift)
+    bb &= mask
+    attacks = bb.copy()
+    for _ in range(6):
+        bb &= empty
+        move(bb, shift, out=bb)
+        bb &= mask
+        attacks |= bb
+    return attacks
+
+
+def _king_attacks(bb):
+    sides = ((bb << np.uint64(1)) & _NOT_A) | ((bb >> np.uint64(1)) & _NOT_H)
+    row = bb | sides
+    return sides | (row << np.uint64(8)) | (row >> np.uint64(8))
+
+
+def _knight_attacks(bb):
+    attacks = np.zeros_like(bb)
+    for step in _KNIGHT_STEPS:
+        attacks |= _step(bb, step)
+    return attacks
+
+
+def _pawn_attacks(bb, white):
+    if white:
+        return ((bb >> np.uint64(7)) & _NOT_A) | ((bb >> np.uint64(9)) & _NOT_H)
+    return ((bb << np.uint64(9)) & _NOT_A) | ((bb << np.uint64(7)) & _NOT_H)
+
+
+def _pawn_move_count(pawns, empty, enemies, allowed):
+    # Pushes and captures of white pawns, counting the four promotion choices on the last row
+    single = (pawns >> np.uint64(8)) & empty
+    double = ((single & _ROW_5) >> np.uint64(8)) & empty
+    count = _popcount(double & allowed).astype(np.int32)
+    for targets in (single, (pawns >> np.uint64(9)) & _NOT_H & enemies, (pawns >> np.uint64(7)) & _NOT_A & enemies):
+        targets &= allowed
+        count += _popcount(targets)
+        count += 3 * _popcount(targets & _ROW_0).astype(np.int32)
+    return count
+
+
+def _orient(pieces, white_turn):
+    # Mirror the black-to-move rows (swap colours and flip the board vertically) so that
+    # every row is evaluated as white to move
+    white = white_turn[:, None]
+    own = np.where(white, pieces[:, :6], pieces[:, 6:])
+    enemy = np.where(white, pieces[:, 6:], pieces[:, :6])
+    return np.where(white, own, own.byteswap()), np.where(white, enemy, enemy.byteswap())
+
+
+def evaluate(codes, white_turn=True, castling=0, ep_squares=-1):
+    """Evaluate N packed positions at once.
+
+    white_turn, castling (Position bit set) and ep_squares (-1 for none) are
+    scalars or length-N arrays. Returns (in_check, attacks, move_counts): whether
+    the side to move is in check, the N x 2 uint64 squares attacked by white and
+    black, and the number of legal moves of the side to move.
+    """
+    codes = np.asarray(codes, dtype=np.int8).reshape(-1, 64)
+    n = len(codes)
+    white_turn = np.broadcast_to(np.asarray(white_turn, dtype=bool), (n,))
+    castling = np.broadcast_to(np.asarray(castling, dtype=np.int64), (n,))
+    ep_squares = np.broadcast_to(np.asarray(ep_squares, dtype=np.int64), (n,))
+
+    own, enemy = _orient(piece_bitboards(codes), white_turn)
+    pawns, knights, bishops, rooks, queens, king = own.T
+    own_occupied = np.bitwise_or.reduce(own, axis=1)
+    enemy_occupied = np.bitwise_or.reduce(enemy, axis=1)
+    empty = ~(own_occupied | enemy_occupied)
+    own_sliders = (rooks | queens, bishops | queens)
+    enemy_sliders = (enemy[:, 3] | enemy[:, 4], enemy[:, 2] | enemy[:, 4])
+
+    # Squares attacked by each side, plus the squares behind the king on a slider's ray,
+    # which the king cannot step back onto
+    own_attacks = _pawn_attacks(pawns, True) | _knight_attacks(knights) | _king_attacks(king)
+    enemy_attacks = _pawn_attacks(enemy[:, 0], False) | _knight_attacks(enemy[:, 1]) | _king_attacks(enemy[:, 5])
+    behind_king = np.zeros(n, dtype=np.uint64)
+    for i, step in enumerate(_DIRECTIONS):
+        own_attacks |= _ray(own_sliders[i >= 4], empty, step)
+        ray = _ray(enemy_sliders[i >= 4], empty, step)
+        enemy_attacks |= ray
+        behind_king |= _step(ray & king, step)
+
+    # Follow each direction from the king: a slider at the end of the ray gives check,
+    # a slider behind a single own piece pins it to that line
+    checkers = (_knight_attacks(king) & enemy[:, 1]) | (_pawn_attacks(king, True) & enemy[:, 0])
+    check_count = _popcount(checkers).astype(np.int32)
+    check_mask = checkers.copy()
+    pinned = np.zeros(n, dtype=np.uint64)
+    pins = []
+    for i, step in enumerate(_DIRECTIONS):
+        sliders = enemy_sliders[i >= 4]
+        ray = _ray(king, empty, step)
+        checking = (ray & sliders) != 0
+        check_count += checking
+        check_mask |= np.where(checking, ray, 0)
+        blocker = ray & own_occupied
+        line = _ray(king, empty | blocker, step)
+        pin = np.where((line & sliders) != 0, blocker, 0)
+        pinned |= pin
+        pins.append((pin, line))
+    in_check = check_count > 0
+    # Out of check any square will do, in single check the move must capture or block
+    check_mask = np.where(check_count == 0, _FULL, np.where(check_count == 1, check_mask, 0))
+    targets = ~own_occupied & check_mask
+
+    move_counts = _popcount(_king_attacks(king) & ~own_occupied & ~(enemy_attacks | behind_king)).astype(np.int32)
+
+    rights = np.where(white_turn, castling & 3, (castling >> 2) & 3)
+    home = king == _E1
+    move_counts += (home & (rights & 1 != 0) & (rooks & _H1 != 0) & (~empty & _KINGSIDE_EMPTY == 0)
+                    & (enemy_attacks & _KINGSIDE_SAFE == 0))
+    move_counts += (home & (rights & 2 != 0) & (rooks & _A1 != 0) & (~empty & _QUEENSIDE_EMPTY == 0)
+                    & (enemy_attacks & _QUEENSIDE_SAFE == 0))
+
+    free = ~pinned
+    knights_free = knights & free
+    for step in _KNIGHT_STEPS:
+        move_counts += _popcount(_step(knights_free, step) & targets)
+    for i, step in enumerate(_DIRECTIONS):
+        move_counts += _popcount(_ray(own_sliders[i >= 4] & free, empty, step) & targets)
+    move_counts += _pawn_move_count(pawns & free, empty, enemy_occupied, check_mask)
+
+    # A pinned piece may only move along its pin line (pinned knights never can)
+    for i, (pin, line) in enumerate(pins):
+        along = (pin & own_sliders[i >= 4]) != 0
+        move_counts += np.where(along, _popcount(line & targets), 0).astype(np.int32)
+        move_counts += _pawn_move_count(pin & pawns, empty, enemy_occupied, check_mask & line)
+
+    # En passant removes two pawns from a row at once: check the king directly after the capture
+    rows = np.flatnonzero(ep_squares >= 0)
+    if len(rows):
+        ep = ep_squares[rows] ^ np.where(white_turn[rows], 0, 56)
+        target = np.left_shift(np.uint64(1), ep.astype(np.uint64))
+        captured = (target << np.uint64(8)) & enemy[rows, 0]
+        king_rows = king[rows]
+        other_checkers = checkers[rows] & ~captured
+        for attacker in ((target << np.uint64(9)) & _NOT_A, (target << np.uint64(7)) & _NOT_H):
+            attacker &= pawns[rows]
+            after = empty[rows] ^ attacker ^ captured ^ target
+            attacked = other_checkers.copy()
+            for i, step in enumerate(_DIRECTIONS):
+                attacked |= _ray(king_rows, after, step) & enemy_sliders[i >= 4][rows]
+            move_counts[rows] += (attacker != 0) & (attacked == 0)
+
+    white_attacks = np.where(white_turn, own_attacks, enemy_attacks.byteswap())
+    black_attacks = np.where(white_turn, enemy_attacks, own_attacks.byteswap())
+    return in_check, np.stack([white_attacks, black_attacks], axis=1), move_counts
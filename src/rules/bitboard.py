@@ -0,0 +1,70 @@
+# --- Bitboard helpers ---
+# Squares are numbered like the list board: square = row * 8 + col.
+# Square 0 is a8 (board[0][0]) and square 63 is h1 (board[7][7]), so white
+# pawns move towards lower square numbers.
+
+FULL = 0xFFFFFFFFFFFFFFFF
+FILE_A = 0x0101010101010101
+FILE_B = FILE_A << 1
+FILE_G = FILE_A << 6
+FILE_H = FILE_A << 7
+NOT_A = FULL ^ FILE_A
+NOT_H = FULL ^ FILE_H
+NOT_AB = FULL ^ (FILE_A | FILE_B)
+NOT_GH = FULL ^ (FILE_G | FILE_H)
+ROW_MASKS = [0xFF << (8 * row) for row in range(8)]
+
+
+def square(row, col):
+    """Return the square index of a (row, col) board coordinate."""
+    return row * 8 + col
+
+
+def row_col(sq):
+    """Return the (row, col) board coordinate of a square index."""
+    return sq >> 3, sq & 7
+
+
+def square_name(sq):
+    """Return the algebraic name of a square index ('e4')."""
+    return 'abcdefgh'[sq & 7] + str(8 - (sq >> 3))
+
+
+def parse_square(name):
+    """Return the square index of an algebraic square name, or raise ValueError."""
+    if len(name) != 2 or name[0] not in 'abcdefgh' or name[1] not in '12345678':
+        raise ValueError(f"Invalid square name: {name!r}")
+    return (8 - int(name[1])) * 8 + 'abcdefgh'.index(name[0])
+
+
+def lsb(bb):
+    """Return the index of the lowest set bit of a non-empty bitboard."""
+    return (bb & -bb).bit_length() - 1
+
+
+def iter_squares(bb):
+    """Yield the square index of every set bit, lowest first."""
+    while bb:
+        low = bb & -bb
+        yield low.bit_length() - 1
+        bb ^= low
+
+
+def knight_attacks(bb):
+    """Return the squares attacked by every knight in bb."""
+    return (((bb << 17) & NOT_A) | ((bb << 15) & NOT_H) | ((bb << 10) & NOT_AB) | ((bb << 6) & NOT_GH)
+            | ((bb >> 15) & NOT_A) | ((bb >> 17) & NOT_H) | ((bb >> 6) & NOT_AB) | ((bb >> 10) & NOT_GH)) & FULL
+
+
+def king_attacks(bb):
+    """Return the squares attacked by every king in bb."""
+    sides = ((bb << 1) & NOT_A) | ((bb >> 1) & NOT_H)
+    row = bb | sides
+    return (sides | (row << 8) | (row >> 8)) & FULL
+
+
+def pawn_attacks(bb, white):
+    """Return the squares attacked by every pawn in bb for the given colour."""
+    if white:
+        return ((bb >> 7) & NOT_A) | ((bb >> 9) & NOT_H)
+    return (((bb << 9) & NOT_A) | ((bb << 7) & NOT_H)) & FULL
@@ -0,0 +1,56 @@
+# --- Nulles ---
+# Draw rules checked in constant time per move: the history of position keys
+# keeps an occurrence count per key, and the halfmove clock counts the moves
+# since the last capture or pawn move.
+from .position import EMPTY, PAWN, PROMOTION
+
+FIFTY_MOVE_PLIES = 100
+REPETITION_COUNT = 3
+STALEMATE, REPETITION, FIFTY_MOVES = 'stalemate', 'repetition', 'fifty moves'
+
+
+class DrawTracker:
+    """Position history and halfmove clock of one game.
+
+    Positions seen before a capture or a pawn move can never occur again, so the
+    history is emptied at those moves and only holds the positions reachable
+    from the current one.
+    """
+
+    __slots__ = ('counts', 'key', 'halfmove_clock')
+
+    def __init__(self, position, halfmove_clock=0):
+        self.counts = {position.key: 1}
+        self.key = position.key
+        self.halfmove_clock = halfmove_clock
+
+    def push(self, position, halfmove_clock=None):
+        """Record the position reached by the last move.
+
+        halfmove_clock is the clock of the game after the move, e.g.
+        GameState.halfmove_clock, so the tracker never keeps a count that could
+        disagree with it. Without it, the clock is advanced from the last move
+        on the position's undo stack.
+        """
+        if halfmove_clock is None:
+            move, captured = position.undo_stack[-1][:2]
+            # The piece on the destination is the one that moved (a pawn, unless it promoted)
+            irreversible = (captured != EMPTY or move >> 14 == PROMOTION
+                            or position.squares[(move >> 6) & 63] % 6 == PAWN)
+            halfmove_clock = 0 if irreversible else self.halfmove_clock + 1
+        if halfmove_clock == 0:
+            self.counts.clear()
+        self.halfmove_clock = halfmove_clock
+        self.key = position.key
+        self.counts[self.key] = self.counts.get(self.key, 0) + 1
+
+    def rule_draw(self):
+        """Return REPETITION or FIFTY_MOVES when the current position is drawn by rule, or None.
+
+        Only for a side to move known to have a legal move: a checkmate on the
+        move that completes the fifty moves wins, and stalemate is told apart
+        by the caller from the empty move list.
+        """
+        if self.counts[self.key] >= REPETITION_COUNT:
+            return REPETITION
+        return FIFTY_MOVES if self.halfmove_clock >= FIFTY_MOVE_PLIES else None
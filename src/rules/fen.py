@@ -0,0 +1,43 @@
+# FEN import and export for the list board and the game state values used by the GUI
+from .bitboard import ROW_MASKS
+from .position import BLACK, KING, PAWN, WHITE, Position, castling_rights_dict
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+
+def validate_position(position):
+    """Raise ValueError if the position cannot occur in a game."""
+    for color, name in ((WHITE, 'white'), (BLACK, 'black')):
+        if bin(position.pieces[color * 6 + KING]).count('1') != 1:
+            raise ValueError(f"Invalid position: {name} must have exactly one king")
+    if (position.pieces[PAWN] | position.pieces[6 + PAWN]) & (ROW_MASKS[0] | ROW_MASKS[7]):
+        raise ValueError("Invalid position: pawn on the first or last row")
+    if position.in_check(BLACK if position.white_turn else WHITE):
+        raise ValueError("Invalid position: the side not to move is in check")
+    if position.ep_square is not None:
+        # The pawn that just moved two squares stands behind the en passant square
+        ep_row = 2 if position.white_turn else 5
+        pawn_sq = position.ep_square + 8 if position.white_turn else position.ep_square - 8
+        pawn = 6 + PAWN if position.white_turn else PAWN
+        if position.ep_square >> 3 != ep_row or position.squares[pawn_sq] != pawn:
+            raise ValueError("Invalid position: no pawn can be captured en passant")
+
+
+def board_from_fen(fen):
+    """Return (board, white_turn, last_pawn_double_move, castling_rights, white_king_pos, black_king_pos) for a FEN."""
+    position = Position.from_fen(fen)
+    validate_position(position)
+    last_pawn_double_move = None
+    if position.ep_square is not None:
+        pawn_sq = position.ep_square + 8 if position.white_turn else position.ep_square - 8
+        last_pawn_double_move = divmod(pawn_sq, 8)
+    white_king_pos = divmod(position.kings[WHITE], 8)
+    black_king_pos = divmod(position.kings[BLACK], 8)
+    return (position.to_board(), position.white_turn, last_pawn_double_move, castling_rights_dict(position.castling),
+            white_king_pos, black_king_pos)
+
+
+def board_to_fen(board, white_turn, last_pawn_double_move, castling_rights, halfmove_clock=0, fullmove_number=1):
+    """Return the FEN string of the list board and game state values."""
+    position = Position.from_board(board, white_turn, last_pawn_double_move, castling_rights)
+    return position.to_fen(halfmove_clock, fullmove_number)
@@ -0,0 +1,121 @@
+# Rules applied to the 8x8 list board and the game state values used by the GUI
+import logging
+
+from .instrument import timed
+from .movegen import has_legal_move, legal_moves
+from .position import cached_position
+from .status import possible_moves_from
+
+logger = logging.getLogger(__name__)
+
+def init_board():
+    """Initialize the chess board and return the board data along with king positions."""
+    board = [
+        ['r', 'n', 'b', 'q', 'k', 'b', 'n', 'r'],
+        ['p', 'p', 'p', 'p', 'p', 'p', 'p', 'p'],
+        [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '],
+        [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '],
+        [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '],
+        [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '],
+        ['P', 'P', 'P', 'P', 'P', 'P', 'P', 'P'],
+        ['R', 'N', 'B', 'Q', 'K', 'B', 'N', 'R']
+    ]
+    if not isinstance(board, list) or not all(isinstance(row, list) for row in board):
+        raise ValueError("Invalid board structure in init_board")
+    white_king_pos = (7, 4)  # Initial position of the white king
+    black_king_pos = (0, 4)  # Initial position of the black king
+    return board, white_king_pos, black_king_pos
+
+@timed()
+def get_possible_moves(board, selected_piece, white_turn, last_pawn_double_move, castling_rights):
+    """Get all possible moves for the selected piece"""
+    # Check if a piece is selected
+    if selected_piece is None:
+        return []
+
+    start_row, start_col = selected_piece
+    position = cached_position(board, white_turn, last_pawn_double_move, castling_rights)
+    return possible_moves_from(legal_moves(position), start_row * 8 + start_col)
+
+@timed()
+def is_checkmate(board, white_turn, castling_rights, last_pawn_double_move, white_king_pos, black_king_pos):
+    """Check if the current player is in checkmate."""
+    if not isinstance(board, list) or not all(isinstance(row, list) for row in board):
+        raise ValueError("Invalid board structure passed to is_checkmate")
+    position = cached_position(board, white_turn, last_pawn_double_move, castling_rights)
+    return position.in_check() and not has_legal_move(position)
+
+@timed()
+def is_stalemate(board, white_turn, castling_rights, last_pawn_double_move):
+    """Check if the current player has no legal move while not in check."""
+    position = cached_position(board, white_turn, last_pawn_double_move, castling_rights)
+    return not position.in_check() and not has_legal_move(position)
+
+@timed()
+def play_move(board, selected_piece, new_row, new_col, white_turn, last_pawn_double_move, castling_rights, promoted_piece=None):
+    """Apply a validated move to the board in place and return the new last_pawn_double_move."""
+    update_board_for_move(board, selected_piece, new_row, new_col)
+    
+    # Handle special moves - this modifies castling_rights
+    handle_special_moves(board, selected_piece, new_row, new_col, white_turn, last_pawn_double_move, castling_rights, promoted_piece)
+    
+    # Update pawn double move correctly
+    if board[new_row][new_col].lower() == 'p' and abs(new_row - selected_piece[0]) == 2:
+        return (new_row, new_col)
+    return None
+
+def update_board_for_move(board, selected_piece, new_row, new_col):
+    board[new_row][new_col] = board[selected_piece[0]][selected_piece[1]]
+    board[selected_piece[0]][selected_piece[1]] = ' '
+
+def handle_special_moves(board, selected_piece, new_row, new_col, white_turn, last_pawn_double_move, castling_rights, promoted_piece):
+    handle_castling(board, selected_piece, new_row, new_col, white_turn, castling_rights)
+    handle_pawn_promotion(board, new_row, new_col, white_turn, promoted_piece)
+    handle_en_passant(board, selected_piece, new_row, new_col, last_pawn_double_move)
+    update_castling_rights(board, selected_piece, new_row, new_col, white_turn, castling_rights)
+
+def handle_castling(board, selected_piece, new_row, new_col, white_turn, castling_rights):
+    if board[new_row][new_col].lower() == 'k' and abs(new_col - selected_piece[1]) == 2:
+        logger.debug("Castling from %s to %d,%d", selected_piece, new_row, new_col)
+        
+        if new_col > selected_piece[1]:  # Kingside castling
+            logger.debug("Moving kingside rook from %s to %s", (new_row, 7), (new_row, 5))
+            board[new_row][5] = board[new_row][7]  # Move rook to F1/F8
+            board[new_row][7] = ' '  # Clear rook's original position
+        else:  # Queenside castling
+            logger.debug("Moving queenside rook from %s to %s", (new_row, 0), (new_row, 3))
+            board[new_row][3] = board[new_row][0]  # Move rook to D1/D8
+            board[new_row][0] = ' '  # Clear rook's original position
+        
+        # Update castling rights
+        side = 'white' if white_turn else 'black'
+        if side in castling_rights:
+            castling_rights[side]['kingside'] = False
+            castling_rights[side]['queenside'] = False
+
+def handle_pawn_promotion(board, new_row, new_col, white_turn, promoted_piece):
+    if board[new_row][new_col].lower() == 'p' and (new_row == 0 or new_row == 7):
+        # Default to a queen when no choice was made (e.g. moves replayed without the dialog)
+        board[new_row][new_col] = promoted_piece or ('Q' if white_turn else 'q')
+
+def handle_en_passant(board, selected_piece, new_row, new_col, last_pawn_double_move):
+    if board[new_row][new_col].lower() == 'p' and last_pawn_double_move == (selected_piece[0], new_col):
+        board[last_pawn_double_move[0]][last_pawn_double_move[1]] = ' '
+
+def update_castling_rights(board, selected_piece, new_row, new_col, white_turn, castling_rights):
+    # If the king moves, disable all castling for that side
+    piece = board[new_row][new_col]
+    side = 'white' if white_turn else 'black'
+    
+    if piece.lower() == 'k':
+        if side in castling_rights:
+            castling_rights[side]['kingside'] = False
+            castling_rights[side]['queenside'] = False
+    
+    # If a rook moves, disable only that side's castling
+    elif piece.lower() == 'r':
+        if side in castling_rights:
+            if selected_piece[1] == 0:  # Queenside rook
+                castling_rights[side]['queenside'] = False
+            elif selected_piece[1] == 7:  # Kingside rook
+                castling_rights[side]['kingside'] = False
@@ -0,0 +1,84 @@
+# --- Instrumentation ---
+# Opt-in call counters and cumulative timers for the hot paths (move generation,
+# make/unmake, legality and check tests, game status, rendering, search). Set PYCHESS_INSTRUMENT=1 before starting
+# a program to enable them: the report is written to stderr on exit, and also
+# every PYCHESS_INSTRUMENT_INTERVAL seconds from loops that call tick(). When
+# the variable is not set, the decorators return the functions unchanged, so the
+# instrumentation costs nothing.
+import atexit
+import functools
+import logging
+import os
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+
+ENABLED = bool(os.environ.get('PYCHESS_INSTRUMENT'))
+try:
+    INTERVAL = float(os.environ.get('PYCHESS_INSTRUMENT_INTERVAL') or 0)
+except ValueError:
+    # A typo in the variable must not stop every program importing the rules
+    logger.warning("PYCHESS_INSTRUMENT_INTERVAL=%r is not a number of seconds, no periodic report",
+                   os.environ['PYCHESS_INSTRUMENT_INTERVAL'])
+    INTERVAL = 0.0
+
+# name -> [calls, seconds]
+_stats = {}
+_last_report = time.perf_counter()
+
+
+def timed(name=None):
+    """Decorator counting the calls of a function and the time spent in it, under name or its qualified name."""
+    def decorate(func):
+        if not ENABLED:
+            return func
+        entry = _stats.setdefault(name or f"{func.__module__}.{func.__qualname__}", [0, 0.0])
+        clock = time.perf_counter
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                entry[0] += 1
+                entry[1] += clock() - start
+        return wrapper
+    return decorate
+
+
+def stats():
+    """Return {name: (calls, seconds)} for every instrumented function called at least once."""
+    return {name: (calls, seconds) for name, (calls, seconds) in _stats.items() if calls}
+
+
+def reset():
+    for entry in _stats.values():
+        entry[0], entry[1] = 0, 0.0
+
+
+def report(file=None):
+    """Write the counters and timers, slowest first."""
+    file = file or sys.stderr
+    rows = sorted(stats().items(), key=lambda item: item[1][1], reverse=True)
+    if not rows:
+        return
+    width = max(len(name) for name, _ in rows)
+    print(f"{'function':<{width}}  {'calls':>9}  {'total ms':>10}  {'mean us':>9}", file=file)
+    for name, (calls, seconds) in rows:
+        print(f"{name:<{width}}  {calls:>9}  {seconds * 1000:>10.1f}  {seconds * 1e6 / calls:>9.1f}", file=file)
+
+
+def tick():
+    """Write the report when the periodic interval has elapsed (call it once per frame or loop iteration)."""
+    global _last_report
+    if ENABLED and INTERVAL > 0:
+        now = time.perf_counter()
+        if now - _last_report >= INTERVAL:
+            _last_report = now
+            report()
+
+
+if ENABLED:
+    atexit.register(report)
@@ -0,0 +1,112 @@
+from .attacks import BETWEEN, BISHOP_RAYS, ROOK_RAYS
+from .bitboard import FULL, ROW_MASKS, iter_squares
+from .instrument import timed
+from .position import (
+    BISHOP, BLACK, CASTLING, EN_PASSANT, KING, NORMAL, PAWN, PROMOTION, PROMOTION_PIECES, QUEEN, ROOK,
+    WHITE, encode_move,
+)
+from .transposition import TranspositionTable
+
+# Legal move lists of recently queried positions, shared by all status queries
+_legal_move_table = TranspositionTable(12)
+
+
+def pinned_pieces(position, color):
+    """Return the set of pieces of the given colour pinned to their king."""
+    king_sq = position.kings[color]
+    if king_sq is None:
+        return 0
+    base = (color ^ 1) * 6
+    pieces = position.pieces
+    queens = pieces[base + QUEEN]
+    # Sliders lined up with the king on an empty board, whatever stands in between
+    snipers = ((ROOK_RAYS[king_sq] & (pieces[base + ROOK] | queens))
+               | (BISHOP_RAYS[king_sq] & (pieces[base + BISHOP] | queens)))
+    occupied = position.occupied
+    own = position.occupancy[color]
+    between = BETWEEN[king_sq]
+    pinned = 0
+    for sniper in iter_squares(snipers):
+        blockers = between[sniper] & occupied
+        # A single piece of ours between the sniper and the king is pinned
+        if blockers & own and not blockers & (blockers - 1):
+            pinned |= blockers
+    return pinned
+
+
+@timed()
+def generate_legal_moves(position, captures_only=False):
+    """Return every legal move of the side to move as a list of 16-bit moves.
+
+    With captures_only, only captures (en passant included) and promotions are returned.
+    """
+    color = WHITE if position.white_turn else BLACK
+    squares = position.squares
+    ep_square = position.ep_square
+    if captures_only:
+        target_mask = position.occupancy[color ^ 1]
+        pawn_mask = target_mask | ROW_MASKS[0] | ROW_MASKS[7] | (0 if ep_square is None else 1 << ep_square)
+    else:
+        target_mask = pawn_mask = FULL
+    # Outside of check, only king moves, pinned pieces and en passant can expose the king
+    check_all = position.in_check(color)
+    pinned = 0 if check_all else pinned_pieces(position, color)
+    moves = []
+    for from_sq in iter_squares(position.occupancy[color]):
+        kind = squares[from_sq] % 6
+        verify = check_all or kind == KING or pinned >> from_sq & 1
+        for to_sq in iter_squares(position.targets(from_sq) & (pawn_mask if kind == PAWN else target_mask)):
+            flag = NORMAL
+            if kind == PAWN:
+                if to_sq == ep_square:
+                    flag = EN_PASSANT
+                elif to_sq < 8 or to_sq >= 56:
+                    flag = PROMOTION
+            elif kind == KING and abs(to_sq - from_sq) == 2:
+                flag = CASTLING
+            if (verify or flag == EN_PASSANT) and not position.leaves_king_safe(from_sq, to_sq):
+                continue
+            if flag == PROMOTION:
+                for promotion in PROMOTION_PIECES:
+                    moves.append(encode_move(from_sq, to_sq, PROMOTION, promotion))
+            else:
+                moves.append(encode_move(from_sq, to_sq, flag))
+    return moves
+
+
+@timed()
+def has_legal_move(position):
+    """Return whether the side to move has a legal move, stopping at the first one found.
+
+    Cheaper than generating every move when only mate and stalemate matter.
+    """
+    color = WHITE if position.white_turn else BLACK
+    squares = position.squares
+    ep_square = position.ep_square
+    check_all = position.in_check(color)
+    pinned = 0 if check_all else pinned_pieces(position, color)
+    for from_sq in iter_squares(position.occupancy[color]):
+        targets = position.targets(from_sq)
+        if not targets:
+            continue
+        kind = squares[from_sq] % 6
+        verify = check_all or kind == KING or pinned >> from_sq & 1
+        if not verify and not (kind == PAWN and ep_square is not None and targets >> ep_square & 1):
+            return True
+        for to_sq in iter_squares(targets):
+            if position.leaves_king_safe(from_sq, to_sq):
+                return True
+    return False
+
+
+@timed()
+def legal_moves(position):
+    """Return the legal moves of the position, reusing the list computed for the same key.
+
+    The returned list is shared and must not be modified.
+    """
+    moves = _legal_move_table.probe(position.key)
+    if moves is None:
+        moves = generate_legal_moves(position)
+        _legal_move_table.store(position.key, moves)
+    return moves
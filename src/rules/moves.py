@@ -0,0 +1,24 @@
+from .instrument import timed
+from .position import BLACK, WHITE, cached_position
+
+
+@timed()
+def is_valid_move(board, start_row, start_col, end_row, end_col, white_turn, last_pawn_double_move, castling_rights):
+    if board[start_row][start_col] == ' ':
+        return False
+
+    # Piece rules, castling, en passant and king safety are all answered by the bitboard position
+    position = cached_position(board, white_turn, last_pawn_double_move, castling_rights)
+    return position.is_legal(start_row * 8 + start_col, end_row * 8 + end_col)
+
+@timed()
+def is_king_in_check(board, white_turn, king_pos=None, castling_rights=None):
+    # Ensure `board` is a list of rows
+    if not isinstance(board, list) or not all(isinstance(row, list) for row in board):
+        raise ValueError("Invalid board structure passed to is_king_in_check")
+
+    position = cached_position(board, white_turn)
+    color = WHITE if white_turn else BLACK
+    if king_pos is None:  # Check the king where it stands (False if it is not on the board)
+        return position.in_check(color)
+    return position.is_attacked(king_pos[0] * 8 + king_pos[1], color ^ 1)
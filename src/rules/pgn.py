@@ -0,0 +1,199 @@
+# Streaming PGN reader: games are read one at a time from any iterable of lines
+# (usually an open file), so a database of any size is processed in constant memory.
+import re
+
+from .bitboard import parse_square, square_name
+from .fen import START_FEN, validate_position
+from .movegen import generate_legal_moves
+from .position import (
+    CASTLING, EMPTY, EN_PASSANT, PAWN, PIECE_CHARS, Position, move_flag, move_from, move_promotion, move_to,
+)
+
+RESULTS = ('1-0', '0-1', '1/2-1/2', '*')
+_TAG_RE = re.compile(r'\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+_TAG_ESCAPE_RE = re.compile(r'\\([\\"])')  # The only escapes of PGN strings: \" and \\
+_TOKEN_RE = re.compile(r'[{}();]|[^\s{}();]+')
+_MOVE_NUMBER_RE = re.compile(r'\d+\.+')
+_SAN_RE = re.compile(r'([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQ]))?')
+
+
+class IllegalMoveError(ValueError):
+    """Raised when a SAN move cannot be played in the position."""
+
+    def __init__(self, san, reason, ply=None):
+        super().__init__(f"{reason}: {san!r}")
+        self.san = san
+        self.reason = reason
+        self.ply = ply  # Half-move number of the move in its game, set by replay_game
+        self.fen = None  # Position the move was played in, set by replay_game
+
+
+class PgnGame:
+    """One game read from a PGN file: its tag pairs, SAN moves and result."""
+
+    __slots__ = ('headers', 'moves', 'result', 'line')
+
+    def __init__(self, line):
+        self.headers = {}
+        self.moves = []
+        self.result = '*'
+        self.line = line  # Line number where the game starts in its file
+
+    def start_position(self):
+        """Return the Position the game starts from (its FEN tag or the initial position)."""
+        position = Position.from_fen(self.headers.get('FEN', START_FEN))
+        validate_position(position)
+        return position
+
+
+def read_games(lines):
+    """Yield a PgnGame for every game in an iterable of PGN lines."""
+    game = None
+    in_comment = False
+    depth = 0  # Nesting level of the variation being skipped
+    for number, line in enumerate(lines, 1):
+        pos = 0
+        if in_comment:
+            end = line.find('}')
+            if end < 0:
+                continue
+            in_comment = False
+            pos = end + 1
+        elif line.startswith('%'):
+            continue
+        elif line.lstrip().startswith('[') and not depth:
+            tags = _TAG_RE.findall(line)
+            if tags:
+                if game is not None and game.moves:
+                    # Tag pairs after movetext start the next game even without a result token
+                    yield game
+                    game = None
+                if game is None:
+                    game = PgnGame(number)
+                for name, value in tags:
+                    game.headers[name] = _TAG_ESCAPE_RE.sub(r'\1', value)
+                continue
+        while True:
+            match = _TOKEN_RE.search(line, pos)
+            if match is None:
+                break
+            token = match.group()
+            pos = match.end()
+            if token == '{':
+                end = line.find('}', pos)
+                if end < 0:
+                    in_comment = True
+                    break
+                pos = end + 1
+            elif token == ';':
+                break
+            elif token == '(':
+                depth += 1
+            elif token == ')':
+                depth = max(depth - 1, 0)
+            elif depth or token in ('}', 'e.p.') or token.startswith('$'):
+                continue
+            elif token in RESULTS:
+                if game is None:
+                    game = PgnGame(number)
+                game.result = token
+                yield game
+                game = None
+            else:
+                token = _MOVE_NUMBER_RE.sub('', token, count=1)
+                if token:
+                    if game is None:
+                        game = PgnGame(number)
+                    game.moves.append(token)
+    if game is not None:
+        yield game
+
+
+def parse_san(position, san, moves=None):
+    """Return the legal move written as san in the position, or raise IllegalMoveError."""
+    if moves is None:
+        moves = generate_legal_moves(position)
+    text = san.rstrip('+#!?')
+    if text in ('O-O', '0-0', 'O-O-O', '0-0-0'):
+        queenside = len(text) == 5
+        for move in moves:
+            if move_flag(move) == CASTLING and (move_to(move) < move_from(move)) == queenside:
+                return move
+        raise IllegalMoveError(san, "Illegal castling")
+    match = _SAN_RE.fullmatch(text)
+    if match is None:
+        raise IllegalMoveError(san, "Unreadable move")
+    piece, from_file, from_rank, to, promotion = match.groups()
+    kind = PIECE_CHARS.index(piece or 'P')
+    to_sq = parse_square(to)
+    promotion = PIECE_CHARS.index(promotion) if promotion else None
+    squares = position.squares
+    candidates = [
+        move for move in moves
+        if move_to(move) == to_sq and squares[move_from(move)] % 6 == kind and move_flag(move) != CASTLING
+        and move_promotion(move) == promotion
+        and (from_file is None or 'abcdefgh'[move_from(move) & 7] == from_file)
+        and (from_rank is None or str(8 - (move_from(move) >> 3)) == from_rank)
+    ]
+    if not candidates:
+        raise IllegalMoveError(san, "Illegal move")
+    if len(candidates) > 1:
+        raise IllegalMoveError(san, "Ambiguous move")
+    return candidates[0]
+
+
+def move_to_san(position, move, moves=None):
+    """Return the SAN of a legal move in the position ('Nbd7', 'exd6', 'e8=Q+', 'O-O')."""
+    if moves is None:
+        moves = generate_legal_moves(position)
+    from_sq, to_sq, flag = move_from(move), move_to(move), move_flag(move)
+    if flag == CASTLING:
+        san = 'O-O' if to_sq > from_sq else 'O-O-O'
+    else:
+        kind = position.squares[from_sq] % 6
+        capture = position.squares[to_sq] != EMPTY or flag == EN_PASSANT
+        if kind == PAWN:
+            san = square_name(from_sq)[0] + 'x' if capture else ''
+        else:
+            san = PIECE_CHARS[kind]
+            # Name the start file, rank or square when another piece of the same kind can go there too
+            rivals = [
+                move_from(other) for other in moves
+                if move_to(other) == to_sq and other != move and position.squares[move_from(other)] % 6 == kind
+                and move_flag(other) != CASTLING
+            ]
+            if rivals:
+                if all(rival & 7 != from_sq & 7 for rival in rivals):
+                    san += square_name(from_sq)[0]
+                elif all(rival >> 3 != from_sq >> 3 for rival in rivals):
+                    san += square_name(from_sq)[1]
+                else:
+                    san += square_name(from_sq)
+            if capture:
+                san += 'x'
+        san += square_name(to_sq)
+        if move_promotion(move) is not None:
+            san += '=' + PIECE_CHARS[move_promotion(move)]
+    position.make_move(move)
+    if position.in_check():
+        san += '+' if generate_legal_moves(position) else '#'
+    position.unmake_move()
+    return san
+
+
+def replay_game(game):
+    """Play every move of a game and return the final Position.
+
+    Raises IllegalMoveError (with its ply and fen set) at the first move that
+    cannot be played, or ValueError if the starting FEN is invalid.
+    """
+    position = game.start_position()
+    for ply, san in enumerate(game.moves, 1):
+        try:
+            move = parse_san(position, san)
+        except IllegalMoveError as error:
+            error.ply = ply
+            error.fen = position.to_fen()
+            raise
+        position.make_move(move)
+    return position
@@ -0,0 +1,528 @@
+from .attacks import (
+    KING_ATTACKS, KNIGHT_ATTACKS, PAWN_ATTACKS, bishop_attacks_from, queen_attacks_from, rook_attacks_from,
+)
+from .bitboard import FULL, ROW_MASKS, iter_squares, parse_square, square_name
+from .instrument import timed
+from .zobrist import CASTLING_KEYS, EP_FILE_KEYS, PIECE_KEYS, SIDE_KEY
+
+# --- Constantes ---
+WHITE, BLACK = 0, 1
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+EMPTY = -1
+# Piece index = colour * 6 + piece type, in the same order as PIECE_CHARS
+PIECE_CHARS = 'PNBRQKpnbrqk'
+PIECE_INDEX = {char: index for index, char in enumerate(PIECE_CHARS)}
+CODE_INDEX = {ord(char): index for index, char in enumerate(PIECE_CHARS)}  # Same, by ASCII code
+SPACE = ord(' ')
+
+# Castling rights are stored as a small bit set
+WHITE_KINGSIDE, WHITE_QUEENSIDE, BLACK_KINGSIDE, BLACK_QUEENSIDE = 1, 2, 4, 8
+ALL_CASTLING = 15
+FEN_CASTLING = {'K': WHITE_KINGSIDE, 'Q': WHITE_QUEENSIDE, 'k': BLACK_KINGSIDE, 'q': BLACK_QUEENSIDE}
+
+WHITE_KING_START, BLACK_KING_START = 60, 4  # e1, e8
+# Rights kept when a piece leaves or lands on a square (king and rook home squares)
+CASTLING_MASKS = [ALL_CASTLING] * 64
+CASTLING_MASKS[0] = ALL_CASTLING ^ BLACK_QUEENSIDE
+CASTLING_MASKS[4] = ALL_CASTLING ^ (BLACK_KINGSIDE | BLACK_QUEENSIDE)
+CASTLING_MASKS[7] = ALL_CASTLING ^ BLACK_KINGSIDE
+CASTLING_MASKS[56] = ALL_CASTLING ^ WHITE_QUEENSIDE
+CASTLING_MASKS[60] = ALL_CASTLING ^ (WHITE_KINGSIDE | WHITE_QUEENSIDE)
+CASTLING_MASKS[63] = ALL_CASTLING ^ WHITE_KINGSIDE
+
+# --- Encodage des coups ---
+# A move is a 16-bit int: from square (bits 0-5), to square (bits 6-11),
+# promotion piece offset from KNIGHT (bits 12-13) and move flag (bits 14-15).
+NORMAL, PROMOTION, EN_PASSANT, CASTLING = 0, 1, 2, 3
+PROMOTION_PIECES = (QUEEN, ROOK, BISHOP, KNIGHT)
+
+
+def encode_move(from_sq, to_sq, flag=NORMAL, promotion=KNIGHT):
+    """Pack a move into its 16-bit representation."""
+    return from_sq | (to_sq << 6) | ((promotion - KNIGHT) << 12) | (flag << 14)
+
+
+def move_from(move):
+    """Return the start square of a move."""
+    return move & 63
+
+
+def move_to(move):
+    """Return the destination square of a move."""
+    return (move >> 6) & 63
+
+
+def move_flag(move):
+    """Return the NORMAL, PROMOTION, EN_PASSANT or CASTLING flag of a move."""
+    return move >> 14
+
+
+def move_promotion(move):
+    """Return the promotion piece type of a move, or None."""
+    return ((move >> 12) & 3) + KNIGHT if move >> 14 == PROMOTION else None
+
+
+def move_to_uci(move):
+    """Return the coordinate notation of a move ('e2e4', 'e7e8q')."""
+    name = square_name(move & 63) + square_name((move >> 6) & 63)
+    if move >> 14 == PROMOTION:
+        name += PIECE_CHARS[6 + ((move >> 12) & 3) + KNIGHT]
+    return name
+
+
+class Position:
+    """Bitboard-backed chess position: twelve piece sets plus occupancy masks."""
+
+    __slots__ = ('pieces', 'occupancy', 'occupied', 'squares', 'white_turn', 'castling', 'ep_square',
+                 'attacks_from', 'attack_maps', 'kings', 'undo_stack', 'key')
+
+    def __init__(self):
+        self.pieces = [0] * 12
+        self.occupancy = [0, 0]  # Per colour
+        self.occupied = 0
+        self.squares = [EMPTY] * 64  # Piece index per square, for O(1) lookups
+        self.white_turn = True
+        self.castling = 0
+        self.ep_square = None  # Square a pawn can capture en passant onto
+        self.attacks_from = [0] * 64  # Squares attacked by the piece on each square
+        self.attack_maps = [0, 0]  # Squares attacked by each colour
+        self.kings = [None, None]  # King square per colour
+        # (move, captured piece, castling, ep_square, key) per made move
+        self.undo_stack = []
+        self.key = CASTLING_KEYS[0]  # Incremental Zobrist key
+
+    @classmethod
+    def from_board(cls, board, white_turn=True, last_pawn_double_move=None, castling_rights=None):
+        """Build a position from the 8x8 list board and the game state values."""
+        position = cls()
+        sq = 0
+        for row in board:
+            for char in row:
+                if char != ' ':
+                    position.put_piece(sq, PIECE_INDEX[char])
+                sq += 1
+        position.white_turn = white_turn
+        position.castling = castling_bits(castling_rights)
+        if last_pawn_double_move is not None:
+            # The pawn that just moved two squares belongs to the side not to move
+            pawn_sq = last_pawn_double_move[0] * 8 + last_pawn_double_move[1]
+            position.ep_square = pawn_sq - 8 if white_turn else pawn_sq + 8
+        position.key ^= position.state_key() ^ CASTLING_KEYS[0]
+        position.refresh_attacks()
+        return position
+
+    @classmethod
+    def from_bytes(cls, squares, white_turn=True, castling=0, ep_square=None):
+        """Build a position from 64 ASCII piece letters (b' ' for an empty square), square 0 first."""
+        position = cls()
+        for sq, code in enumerate(squares):
+            if code != SPACE:
+                position.put_piece(sq, CODE_INDEX[code])
+        position.white_turn = white_turn
+        position.castling = castling
+        position.ep_square = ep_square
+        position.key ^= position.state_key() ^ CASTLING_KEYS[0]
+        position.refresh_attacks()
+        return position
+
+    @classmethod
+    def from_fen(cls, fen):
+        """Build a position from a FEN string, or raise ValueError if it is malformed."""
+        fields = fen.split()
+        if len(fields) < 4:
+            raise ValueError(f"Invalid FEN (expected at least 4 fields): {fen!r}")
+        placement, side, castling, ep = fields[:4]
+        rows = placement.split('/')
+        if len(rows) != 8:
+            raise ValueError(f"Invalid FEN placement (expected 8 rows): {placement!r}")
+        position = cls()
+        for row, text in enumerate(rows):
+            col = 0
+            for char in text:
+                if char.isdigit():
+                    col += int(char)
+                elif char in PIECE_INDEX and col < 8:
+                    position.put_piece(row * 8 + col, PIECE_INDEX[char])
+                    col += 1
+                else:
+                    raise ValueError(f"Invalid FEN row: {text!r}")
+            if col != 8:
+                raise ValueError(f"Invalid FEN row: {text!r}")
+        if side not in ('w', 'b'):
+            raise ValueError(f"Invalid FEN side to move: {side!r}")
+        position.white_turn = side == 'w'
+        if castling != '-':
+            for char in castling:
+                if char not in FEN_CASTLING:
+                    raise ValueError(f"Invalid FEN castling field: {castling!r}")
+                position.castling |= FEN_CASTLING[char]
+        if ep != '-':
+            position.ep_square = parse_square(ep)
+        position.key ^= position.state_key() ^ CASTLING_KEYS[0]
+        position.refresh_attacks()
+        return position
+
+    def to_board(self):
+        """Return the position as an 8x8 list board."""
+        chars = [' ' if piece == EMPTY else PIECE_CHARS[piece] for piece in self.squares]
+        return [chars[row * 8:row * 8 + 8] for row in range(8)]
+
+    def to_fen(self, halfmove_clock=0, fullmove_number=1):
+        """Return the FEN string of the position."""
+        rows = []
+        for row in range(8):
+            text, empty = '', 0
+            for piece in self.squares[row * 8:row * 8 + 8]:
+                if piece == EMPTY:
+                    empty += 1
+                    continue
+                if empty:
+                    text += str(empty)
+                    empty = 0
+                text += PIECE_CHARS[piece]
+            rows.append(text + str(empty) if empty else text)
+        castling = ''.join(char for char, bit in FEN_CASTLING.items() if self.castling & bit) or '-'
+        ep = '-' if self.ep_square is None else square_name(self.ep_square)
+        side = 'w' if self.white_turn else 'b'
+        return f"{'/'.join(rows)} {side} {castling} {ep} {halfmove_clock} {fullmove_number}"
+
+    def copy(self):
+        """Return an independent copy of the position."""
+        position = Position.__new__(Position)
+        position.pieces = self.pieces[:]
+        position.occupancy = self.occupancy[:]
+        position.occupied = self.occupied
+        position.squares = self.squares[:]
+        position.white_turn = self.white_turn
+        position.castling = self.castling
+        position.ep_square = self.ep_square
+        position.attacks_from = self.attacks_from[:]
+        position.attack_maps = self.attack_maps[:]
+        position.kings = self.kings[:]
+        position.undo_stack = self.undo_stack[:]
+        position.key = self.key
+        return position
+
+    def put_piece(self, sq, piece):
+        """Place a piece on an empty square (attack maps are updated separately)."""
+        bb = 1 << sq
+        self.pieces[piece] |= bb
+        self.occupancy[piece // 6] |= bb
+        self.occupied |= bb
+        self.squares[sq] = piece
+        self.key ^= PIECE_KEYS[piece][sq]
+        if piece % 6 == KING:
+            self.kings[piece // 6] = sq
+
+    def remove_piece(self, sq):
+        """Remove and return the piece on a square."""
+        piece = self.squares[sq]
+        bb = 1 << sq
+        self.pieces[piece] ^= bb
+        self.occupancy[piece // 6] ^= bb
+        self.occupied ^= bb
+        self.squares[sq] = EMPTY
+        self.key ^= PIECE_KEYS[piece][sq]
+        if piece % 6 == KING:
+            self.kings[piece // 6] = None
+        return piece
+
+    def move_piece(self, from_sq, to_sq):
+        """Move a piece, capturing whatever stands on to_sq, and update the attack maps."""
+        captured = self.squares[to_sq]
+        if captured != EMPTY:
+            self.remove_piece(to_sq)
+        self.put_piece(to_sq, self.remove_piece(from_sq))
+        self.update_attacks((1 << from_sq) | (1 << to_sq))
+        return captured
+
+    @timed()
+    def make_move(self, move):
+        """Play a 16-bit move in place and push its undo record."""
+        from_sq = move & 63
+        to_sq = (move >> 6) & 63
+        flag = move >> 14
+        squares = self.squares
+        piece = squares[from_sq]
+        color = piece // 6
+        captured = squares[to_sq]
+        self.undo_stack.append((move, captured, self.castling, self.ep_square, self.key))
+        self.key ^= self.state_key()
+        changed = (1 << from_sq) | (1 << to_sq)
+        if captured != EMPTY:
+            self.remove_piece(to_sq)
+        self.remove_piece(from_sq)
+        if flag == PROMOTION:
+            self.put_piece(to_sq, color * 6 + ((move >> 12) & 3) + KNIGHT)
+        else:
+            self.put_piece(to_sq, piece)
+            if flag == EN_PASSANT:
+                capture_sq = to_sq + 8 if color == WHITE else to_sq - 8
+                self.remove_piece(capture_sq)
+                changed |= 1 << capture_sq
+            elif flag == CASTLING:
+                rook_from, rook_to = (to_sq + 1, to_sq - 1) if to_sq > from_sq else (to_sq - 2, to_sq + 1)
+                self.put_piece(rook_to, self.remove_piece(rook_from))
+                changed |= (1 << rook_from) | (1 << rook_to)
+        self.castling &= CASTLING_MASKS[from_sq] & CASTLING_MASKS[to_sq]
+        if piece % 6 == PAWN and (to_sq - from_sq == 16 or from_sq - to_sq == 16):
+            self.ep_square = (from_sq + to_sq) >> 1
+        else:
+            self.ep_square = None
+        self.white_turn = not self.white_turn
+        self.key ^= self.state_key()
+        self.update_attacks(changed)
+
+    @timed()
+    def unmake_move(self):
+        """Take back the last move played with make_move and return it."""
+        move, captured, self.castling, self.ep_square, key = self.undo_stack.pop()
+        from_sq = move & 63
+        to_sq = (move >> 6) & 63
+        flag = move >> 14
+        changed = (1 << from_sq) | (1 << to_sq)
+        piece = self.remove_piece(to_sq)
+        color = piece // 6
+        if flag == PROMOTION:
+            piece = color * 6 + PAWN
+        self.put_piece(from_sq, piece)
+        if captured != EMPTY:
+            self.put_piece(to_sq, captured)
+        if flag == EN_PASSANT:
+            capture_sq = to_sq + 8 if color == WHITE else to_sq - 8
+            self.put_piece(capture_sq, (color ^ 1) * 6 + PAWN)
+            changed |= 1 << capture_sq
+        elif flag == CASTLING:
+            rook_from, rook_to = (to_sq + 1, to_sq - 1) if to_sq > from_sq else (to_sq - 2, to_sq + 1)
+            self.put_piece(rook_from, self.remove_piece(rook_to))
+            changed |= (1 << rook_from) | (1 << rook_to)
+        self.white_turn = not self.white_turn
+        self.key = key
+        # Same squares as on make: the sliders whose rays cross them are the only ones to recompute
+        self.update_attacks(changed)
+        return move
+
+    def state_key(self):
+        """Return the Zobrist key part for side to move, castling rights and en passant file.
+
+        The en passant file only counts when a pawn of the side to move can
+        actually capture, so identical positions get identical keys.
+        """
+        key = CASTLING_KEYS[self.castling]
+        if not self.white_turn:
+            key ^= SIDE_KEY
+        ep_square = self.ep_square
+        if ep_square is not None:
+            color = WHITE if self.white_turn else BLACK
+            if PAWN_ATTACKS[color ^ 1][ep_square] & self.pieces[color * 6 + PAWN]:
+                key ^= EP_FILE_KEYS[ep_square & 7]
+        return key
+
+    def compute_key(self):
+        """Compute the Zobrist key from scratch (the incremental key must always match it)."""
+        key = self.state_key()
+        for sq in iter_squares(self.occupied):
+            key ^= PIECE_KEYS[self.squares[sq]][sq]
+        return key
+
+    def king_square(self, color):
+        """Return the square of the king of the given colour, or None."""
+        return self.kings[color]
+
+    def piece_attacks(self, sq, piece):
+        """Return the squares attacked by a piece standing on a square."""
+        color, kind = divmod(piece, 6)
+        if kind == PAWN:
+            return PAWN_ATTACKS[color][sq]
+        if kind == KNIGHT:
+            return KNIGHT_ATTACKS[sq]
+        if kind == BISHOP:
+            return bishop_attacks_from(sq, self.occupied)
+        if kind == ROOK:
+            return rook_attacks_from(sq, self.occupied)
+        if kind == QUEEN:
+            return queen_attacks_from(sq, self.occupied)
+        return KING_ATTACKS[sq]
+
+    def refresh_attacks(self):
+        """Recompute the attack set of every piece and both attack maps."""
+        attacks_from = self.attacks_from = [0] * 64
+        squares = self.squares
+        for sq in iter_squares(self.occupied):
+            attacks_from[sq] = self.piece_attacks(sq, squares[sq])
+        self._rebuild_attack_maps()
+
+    def update_attacks(self, changed):
+        """Update the attack maps after the contents of the `changed` squares changed.
+
+        Only the pieces on changed squares and the sliders whose rays reach a
+        changed square need their attack sets recomputed.
+        """
+        attacks_from = self.attacks_from
+        squares = self.squares
+        for sq in iter_squares(changed):
+            piece = squares[sq]
+            attacks_from[sq] = 0 if piece == EMPTY else self.piece_attacks(sq, piece)
+        pieces = self.pieces
+        sliders = (pieces[BISHOP] | pieces[ROOK] | pieces[QUEEN] | pieces[6 + BISHOP]
+                   | pieces[6 + ROOK] | pieces[6 + QUEEN]) & ~changed
+        for sq in iter_squares(sliders):
+            if attacks_from[sq] & changed:
+                attacks_from[sq] = self.piece_attacks(sq, squares[sq])
+        self._rebuild_attack_maps()
+
+    def _rebuild_attack_maps(self):
+        attacks_from = self.attacks_from
+        for color in (WHITE, BLACK):
+            attacked = 0
+            for sq in iter_squares(self.occupancy[color]):
+                attacked |= attacks_from[sq]
+            self.attack_maps[color] = attacked
+
+    def attackers_to(self, sq, by_color, occupied, excluded=0):
+        """Return True if the square is attacked by by_color.
+
+        `occupied` is the blocker set to use for sliding pieces and `excluded`
+        removes captured pieces from the attacking side.
+        """
+        pieces = self.pieces
+        base = by_color * 6
+        keep = ~excluded
+        # A piece attacks sq exactly when the same piece on sq would attack it
+        if PAWN_ATTACKS[by_color ^ 1][sq] & pieces[base + PAWN] & keep:
+            return True
+        if KNIGHT_ATTACKS[sq] & pieces[base + KNIGHT] & keep:
+            return True
+        if KING_ATTACKS[sq] & pieces[base + KING]:
+            return True
+        queens = pieces[base + QUEEN]
+        rooks = (pieces[base + ROOK] | queens) & keep
+        if rooks and rook_attacks_from(sq, occupied) & rooks:
+            return True
+        bishops = (pieces[base + BISHOP] | queens) & keep
+        return bool(bishops and bishop_attacks_from(sq, occupied) & bishops)
+
+    def is_attacked(self, sq, by_color):
+        """Return True if the square is attacked by the given colour."""
+        return bool(self.attack_maps[by_color] >> sq & 1)
+
+    def in_check(self, color=None):
+        """Return True if the king of the given colour (default: side to move) is attacked."""
+        if color is None:
+            color = WHITE if self.white_turn else BLACK
+        king_sq = self.kings[color]
+        return king_sq is not None and bool(self.attack_maps[color ^ 1] >> king_sq & 1)
+
+    def targets(self, sq):
+        """Return the pseudo-legal destination set of the piece on a square."""
+        piece = self.squares[sq]
+        color, kind = divmod(piece, 6)
+        if kind == PAWN:
+            return self._pawn_targets(sq, color)
+        targets = self.attacks_from[sq] & ~self.occupancy[color]
+        if kind == KING:
+            # Squares attacked right now stay attacked once the king steps onto them
+            return (targets & ~self.attack_maps[color ^ 1]) | self._castling_targets(color)
+        return targets
+
+    def _pawn_targets(self, sq, color):
+        bb = 1 << sq
+        empty = FULL ^ self.occupied
+        if color == WHITE:
+            single = (bb >> 8) & empty
+            double = ((single & ROW_MASKS[5]) >> 8) & empty
+        else:
+            single = (bb << 8) & empty
+            double = ((single & ROW_MASKS[2]) << 8) & empty
+        enemies = self.occupancy[color ^ 1]
+        if self.ep_square is not None:
+            enemies |= 1 << self.ep_square
+        return single | double | (PAWN_ATTACKS[color][sq] & enemies)
+
+    def _castling_targets(self, color):
+        rights = self.castling >> (2 * color) & 3
+        king_sq = WHITE_KING_START if color == WHITE else BLACK_KING_START
+        if not rights or self.squares[king_sq] != color * 6 + KING:
+            return 0
+        attacked = self.attack_maps[color ^ 1]
+        rook = color * 6 + ROOK
+        occupied = self.occupied
+        targets = 0
+        # The king may not start in, pass through or land in check
+        if (rights & 1 and self.squares[king_sq + 3] == rook and not occupied & (6 << king_sq)
+                and not attacked & (7 << king_sq)):
+            targets |= 1 << (king_sq + 2)
+        if (rights & 2 and self.squares[king_sq - 4] == rook and not occupied & (7 << (king_sq - 3))
+                and not attacked & (7 << (king_sq - 2))):
+            targets |= 1 << (king_sq - 2)
+        return targets
+
+    @timed()
+    def leaves_king_safe(self, from_sq, to_sq):
+        """Return True if moving from_sq to to_sq does not leave the mover's king attacked."""
+        piece = self.squares[from_sq]
+        color, kind = divmod(piece, 6)
+        them = color ^ 1
+        to_bb = 1 << to_sq
+        captured = to_bb & self.occupancy[them]
+        if kind == PAWN and to_sq == self.ep_square:
+            captured = 1 << (to_sq + 8 if color == WHITE else to_sq - 8)
+        occupied = (self.occupied ^ (1 << from_sq) ^ captured) | to_bb
+        king_sq = to_sq if kind == KING else self.kings[color]
+        return king_sq is None or not self.attackers_to(king_sq, them, occupied, captured)
+
+    @timed()
+    def is_legal(self, from_sq, to_sq):
+        """Return True if the side to move may play from_sq to to_sq."""
+        piece = self.squares[from_sq]
+        if piece == EMPTY or piece // 6 != (WHITE if self.white_turn else BLACK):
+            return False
+        if not self.targets(from_sq) >> to_sq & 1:
+            return False
+        return self.leaves_king_safe(from_sq, to_sq)
+
+
+_position_cache = {}
+POSITION_CACHE_SIZE = 16
+
+
+@timed()
+def cached_position(board, white_turn=True, last_pawn_double_move=None, castling_rights=None):
+    """Return a position for the list board, reusing the one built for an identical state.
+
+    The returned position is shared between callers and must be left unchanged.
+    """
+    key = (tuple(map(tuple, board)), white_turn, last_pawn_double_move, castling_bits(castling_rights))
+    position = _position_cache.get(key)
+    if position is None:
+        if len(_position_cache) >= POSITION_CACHE_SIZE:
+            _position_cache.clear()
+        position = _position_cache[key] = Position.from_board(board, white_turn, last_pawn_double_move,
+                                                              castling_rights)
+    return position
+
+
+def castling_bits(castling_rights):
+    """Convert the nested castling_rights dict to a castling bit set."""
+    if not castling_rights:
+        return 0
+    bits = 0
+    white = castling_rights.get('white', {})
+    black = castling_rights.get('black', {})
+    if white.get('kingside'):
+        bits |= WHITE_KINGSIDE
+    if white.get('queenside'):
+        bits |= WHITE_QUEENSIDE
+    if black.get('kingside'):
+        bits |= BLACK_KINGSIDE
+    if black.get('queenside'):
+        bits |= BLACK_QUEENSIDE
+    return bits
+
+
+def castling_rights_dict(bits):
+    """Convert a castling bit set to the nested castling_rights dict used by the GUI."""
+    return {
+        'white': {'kingside': bool(bits & WHITE_KINGSIDE), 'queenside': bool(bits & WHITE_QUEENSIDE)},
+        'black': {'kingside': bool(bits & BLACK_KINGSIDE), 'queenside': bool(bits & BLACK_QUEENSIDE)},
+    }
@@ -0,0 +1,139 @@
+# --- État de la partie ---
+# Everything the GUI, the engine and worker processes need about a game in
+# progress, in one slotted object: the board is a 64-byte array of piece
+# letters and the castling rights a 4-bit set, so the state is cheap to copy,
+# compare and pickle.
+from .fen import START_FEN, validate_position
+from .position import CASTLING_MASKS, CODE_INDEX, PIECE_CHARS, SPACE, Position, castling_rights_dict
+
+_PAWN_CODES = (ord('P'), ord('p'))
+_KING_CODES = (ord('K'), ord('k'))
+
+
+class GameState:
+    """Board, side to move, castling, en passant and clocks of a game, plus the GUI selection.
+
+    Moves are applied in place with play(); use copy() to keep an earlier state.
+    """
+
+    __slots__ = ('squares', 'white_turn', 'castling', 'ep_square', 'kings', 'halfmove_clock', 'fullmove_number',
+                 'ply', 'selected', 'running')
+
+    def __init__(self):
+        self.squares = bytearray(b' ' * 64)  # ASCII piece letter per square, square 0 is a8
+        self.white_turn = True
+        self.castling = 0  # WHITE_KINGSIDE | WHITE_QUEENSIDE | BLACK_KINGSIDE | BLACK_QUEENSIDE bits
+        self.ep_square = None  # Square a pawn can capture en passant onto
+        self.kings = [None, None]  # King square per colour
+        self.halfmove_clock = 0
+        self.fullmove_number = 1
+        self.ply = 0  # Moves played since the state was created
+        self.selected = None  # (row, col) of the piece picked up in the GUI
+        self.running = True
+
+    @classmethod
+    def from_position(cls, position, halfmove_clock=0, fullmove_number=1):
+        state = cls()
+        for sq, piece in enumerate(position.squares):
+            if piece >= 0:
+                state.squares[sq] = ord(PIECE_CHARS[piece])
+        state.white_turn = position.white_turn
+        state.castling = position.castling
+        state.ep_square = position.ep_square
+        state.kings = position.kings[:]
+        state.halfmove_clock = halfmove_clock
+        state.fullmove_number = fullmove_number
+        return state
+
+    @classmethod
+    def from_fen(cls, fen=START_FEN):
+        """Return the state of a FEN string, or raise ValueError if it is malformed or not a legal position."""
+        position = Position.from_fen(fen)
+        validate_position(position)
+        clocks = fen.split()[4:6]
+        try:
+            halfmove_clock, fullmove_number = (int(clocks[0]), int(clocks[1])) if len(clocks) == 2 else (0, 1)
+        except ValueError:
+            raise ValueError(f"Invalid FEN move counters: {' '.join(clocks)!r}") from None
+        return cls.from_position(position, halfmove_clock, fullmove_number)
+
+    def copy(self):
+        state = GameState.__new__(GameState)
+        state.squares = self.squares[:]
+        state.white_turn = self.white_turn
+        state.castling = self.castling
+        state.ep_square = self.ep_square
+        state.kings = self.kings[:]
+        state.halfmove_clock = self.halfmove_clock
+        state.fullmove_number = self.fullmove_number
+        state.ply = self.ply
+        state.selected = self.selected
+        state.running = self.running
+        return state
+
+    def key(self):
+        """Return an immutable snapshot of the position, usable as a dict key or set member.
+
+        Clocks and GUI selection do not make two states different.
+        """
+        return bytes(self.squares), self.white_turn, self.castling, self.ep_square
+
+    def __eq__(self, other):
+        if not isinstance(other, GameState):
+            return NotImplemented
+        return self.key() == other.key()
+
+    # play() changes the state in place, so it cannot be hashed: use key() instead
+    __hash__ = None
+
+    def piece_at(self, row, col):
+        """Return the piece letter on a square, or ' ' when it is empty."""
+        return chr(self.squares[row * 8 + col])
+
+    def position(self):
+        """Return a Position for the rules and the engine."""
+        return Position.from_bytes(self.squares, self.white_turn, self.castling, self.ep_square)
+
+    def to_board(self):
+        """Return the 8x8 list board used by the rules.game functions."""
+        chars = self.squares.decode('ascii')
+        return [list(chars[row * 8:row * 8 + 8]) for row in range(8)]
+
+    def castling_rights(self):
+        """Return the castling rights as the nested dict used by the rules.game functions."""
+        return castling_rights_dict(self.castling)
+
+    def to_fen(self):
+        position = self.position()
+        return position.to_fen(self.halfmove_clock, self.fullmove_number)
+
+    def play(self, from_sq, to_sq, promoted_piece=None):
+        """Apply a legal move in place; promoted_piece is the letter a pawn reaching the last row becomes."""
+        squares = self.squares
+        code = squares[from_sq]
+        capture = squares[to_sq] != SPACE
+        squares[to_sq] = code
+        squares[from_sq] = SPACE
+        if code in _PAWN_CODES:
+            if to_sq == self.ep_square:
+                # The captured pawn stands behind the en passant square
+                squares[to_sq + 8 if self.white_turn else to_sq - 8] = SPACE
+                capture = True
+            elif to_sq < 8 or to_sq >= 56:
+                promoted = promoted_piece or 'q'
+                squares[to_sq] = ord(promoted.upper() if self.white_turn else promoted.lower())
+        elif code in _KING_CODES:
+            self.kings[CODE_INDEX[code] // 6] = to_sq
+            if abs(to_sq - from_sq) == 2:
+                # Castling: the rook jumps over the king
+                rook_from, rook_to = (from_sq + 3, from_sq + 1) if to_sq > from_sq else (from_sq - 4, from_sq - 1)
+                squares[rook_to] = squares[rook_from]
+                squares[rook_from] = SPACE
+        self.castling &= CASTLING_MASKS[from_sq] & CASTLING_MASKS[to_sq]
+        self.ep_square = (from_sq + to_sq) // 2 if code in _PAWN_CODES and abs(to_sq - from_sq) == 16 else None
+        self.halfmove_clock = 0 if capture or code in _PAWN_CODES else self.halfmove_clock + 1
+        if not self.white_turn:
+            self.fullmove_number += 1
+        self.white_turn = not self.white_turn
+        self.ply += 1
+        self.selected = None
@@ -0,0 +1,98 @@
+from .draws import STALEMATE, DrawTracker
+from .instrument import timed
+from .movegen import legal_moves
+from .position import CASTLING, move_flag, move_from, move_to
+
+
+class GameStatus:
+    """Everything the render loop needs to know about one position."""
+
+    __slots__ = ('key', 'move_count', 'moves', 'in_check', 'king_pos', 'moves_by_square', 'checkmate', 'stalemate',
+                 'draw', 'endgame')
+
+    @timed()
+    def __init__(self, position, move_count, tablebases=None, draws=None):
+        self.moves = moves = legal_moves(position)
+        self.key = position.key
+        self.move_count = move_count
+        self.in_check = position.in_check()
+        king_sq = position.king_square(0 if position.white_turn else 1)
+        self.king_pos = (king_sq // 8, king_sq % 8) if self.in_check else None
+        self.moves_by_square = {}
+        for move in moves:
+            start_sq = move_from(move)
+            start_pos = (start_sq // 8, start_sq % 8)
+            if start_pos not in self.moves_by_square:
+                self.moves_by_square[start_pos] = possible_moves_from(moves, start_sq)
+        self.checkmate = self.in_check and not moves
+        self.stalemate = not self.in_check and not moves
+        # STALEMATE, REPETITION or FIFTY_MOVES when the game is drawn, else None
+        if self.stalemate:
+            self.draw = STALEMATE
+        else:
+            # The legal moves are known, so only repetition and the fifty-move rule are left to check
+            self.draw = draws.rule_draw() if draws is not None and moves else None
+        # (result, plies to mate) for the side to move when an endgame table covers the position
+        self.endgame = tablebases.probe(position) if tablebases is not None and moves else None
+
+    def possible_moves(self, selected_piece):
+        """Return the squares to highlight for the selected piece."""
+        return self.moves_by_square.get(selected_piece, [])
+
+    def legal_move(self, from_sq, to_sq):
+        """Return the legal move from from_sq to to_sq (the queen promotion for a pawn), or None."""
+        for move in self.moves:
+            if move & 63 == from_sq and (move >> 6) & 63 == to_sq:
+                return move
+        return None
+
+
+class GameStatusCache:
+    """Single-entry cache of the current game status, replaced only when a move is made.
+
+    It also keeps the draw history of the game: every new status is one more
+    position in it.
+    """
+
+    __slots__ = ('status', 'tablebases', 'draws')
+
+    def __init__(self, tablebases=None):
+        self.status = None
+        self.tablebases = tablebases
+        self.draws = None
+
+    def get(self, state):
+        """Return the status of a GameState, recomputed only when a move was played since the last call."""
+        status = self.status
+        if status is None or status.move_count != state.ply:
+            move_count = state.ply
+            position = state.position()
+            if self.draws is None:
+                self.draws = DrawTracker(position, state.halfmove_clock)
+            else:
+                self.draws.push(position, state.halfmove_clock)
+            status = self.status = GameStatus(position, move_count, self.tablebases, self.draws)
+        return status
+
+    def invalidate(self):
+        """Forget the cached status and the draw history (e.g. when the game is reset)."""
+        self.status = None
+        self.draws = None
+
+
+def possible_moves_from(moves, start_sq):
+    """Return the (row, col) squares to highlight for the piece on start_sq."""
+    possible_moves = []
+    for move in moves:
+        if move_from(move) != start_sq:
+            continue
+        end_sq = move_to(move)
+        end_pos = (end_sq // 8, end_sq % 8)
+        if end_pos not in possible_moves:
+            possible_moves.append(end_pos)
+
+        # Special case for castling - also highlight the square the rook will move to
+        if move_flag(move) == CASTLING:
+            possible_moves.append((end_pos[0], 5 if end_sq > start_sq else 3))
+
+    return possible_moves
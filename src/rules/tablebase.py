@@ -0,0 +1,373 @@
+# --- Tables de finales ---
+# Win/draw/loss and distance to mate for every position of a small material set
+# (KQK, KRK, KPK, ...), computed by retrograde analysis: starting from the
+# checkmates, the positions one move before a known result are solved ply by
+# ply until nothing changes, and whatever is left is a draw. A table holds one
+# byte per (side to move, square of every piece) index, so a probe is a single
+# read in a memory-mapped file. Tables assume no castling rights, and ignore en
+# passant, so only one side may have pawns.
+import itertools
+import mmap
+import os
+import struct
+
+from .attacks import (
+    KING_ATTACKS, KNIGHT_ATTACKS, PAWN_ATTACKS, bishop_attacks_from, queen_attacks_from, rook_attacks_from,
+)
+from .bitboard import iter_squares
+from .movegen import generate_legal_moves
+from .position import BISHOP, KING, KNIGHT, PAWN, PIECE_CHARS, QUEEN, ROOK
+
+HEADER = struct.Struct('>4sB11s')
+MAGIC = b'PCTB'
+EXTENSION = '.tb'
+WIN, DRAW, LOSS = 1, 0, -1
+MAX_PLIES = 254
+# Material that can never mate: every position is a draw, no table is needed
+DRAWN_MATERIAL = {'KK', 'KBK', 'KKB', 'KNK', 'KKN'}
+
+_ORDER = (KING, QUEEN, ROOK, BISHOP, KNIGHT, PAWN)
+
+
+def material_name(pieces):
+    """Return the material name ('KQK', 'KRKP', ...) of a list of piece indexes, white pieces first."""
+    sides = ['', '']
+    for piece in sorted(pieces, key=lambda piece: _ORDER.index(piece % 6)):
+        sides[piece // 6] += PIECE_CHARS[piece % 6]
+    return sides[0] + sides[1]
+
+
+def material_pieces(name):
+    """Return the piece indexes of a material name, in table order."""
+    name = name.upper()
+    black = name.find('K', 1)
+    if not name.startswith('K') or black < 0 or 'K' in name[black + 1:] or any(c not in 'KQRBNP' for c in name):
+        raise ValueError(f"invalid material {name!r}: expected the white pieces then the black ones, e.g. 'KRK'")
+    return [PIECE_CHARS.index(c) for c in name[:black]] + [6 + PIECE_CHARS.index(c) for c in name[black:]]
+
+
+def check_material(name):
+    """Return the piece indexes of a material set a table can be generated for, or raise ValueError.
+
+    En passant is not modelled, so only one side may have pawns.
+    """
+    pieces = material_pieces(name)
+    if PAWN in pieces and 6 + PAWN in pieces:
+        raise ValueError(f"no table for {material_name(pieces)}: with pawns on both sides en passant "
+                         "would matter, and the tables ignore it")
+    return pieces
+
+
+def _attacks(piece, sq, occupied):
+    kind = piece % 6
+    if kind == KING:
+        return KING_ATTACKS[sq]
+    if kind == KNIGHT:
+        return KNIGHT_ATTACKS[sq]
+    if kind == PAWN:
+        return PAWN_ATTACKS[piece // 6][sq]
+    if kind == BISHOP:
+        return bishop_attacks_from(sq, occupied)
+    if kind == ROOK:
+        return rook_attacks_from(sq, occupied)
+    return queen_attacks_from(sq, occupied)
+
+
+def _attacked(sq, by_color, pieces, squares, occupied):
+    target = 1 << sq
+    for piece, piece_sq in zip(pieces, squares):
+        if piece // 6 == by_color and piece_sq >= 0 and _attacks(piece, piece_sq, occupied) & target:
+            return True
+    return False
+
+
+def _in_check(color, pieces, squares):
+    occupied = 0
+    for sq in squares:
+        if sq >= 0:
+            occupied |= 1 << sq
+    return _attacked(squares[pieces.index(color * 6 + KING)], 1 - color, pieces, squares, occupied)
+
+
+def _table_index(side, squares):
+    index = side
+    for sq in squares:
+        index = index * 64 + sq
+    return index
+
+
+def _lookup(tables, pieces, squares, side):
+    # Value of a position in another table: (result, plies) from the side to move's point of view
+    present = [(piece, sq) for piece, sq in zip(pieces, squares) if sq >= 0]
+    name = material_name([piece for piece, _ in present])
+    if name in DRAWN_MATERIAL:
+        return DRAW, 0
+    if name not in tables:
+        # The same endgame with the colours exchanged: mirror the board vertically
+        present = [((piece + 6) % 12, sq ^ 56) for piece, sq in present]
+        name, side = material_name([piece for piece, _ in present]), 1 - side
+        if name not in tables:
+            raise KeyError(f"the {name} table is needed")
+    # Same-piece order as the table, whatever order the pieces were listed in
+    order = material_pieces(name)
+    placed = sorted(present, key=lambda entry: order.index(entry[0]))
+    return decode(tables[name][HEADER.size + _table_index(side, [sq for _, sq in placed])])
+
+
+def decode(value):
+    """Turn a stored byte into (result, plies to mate) for the side to move."""
+    if value == 0:
+        return DRAW, 0
+    plies = value - 1
+    return (WIN if plies % 2 else LOSS), plies
+
+
+def _moves(pieces, squares, side):
+    # Yield (piece position in the list, destination, captured position or -1, promotion piece or None)
+    own = enemy = 0
+    for piece, sq in zip(pieces, squares):
+        if sq >= 0:
+            if piece // 6 == side:
+                own |= 1 << sq
+            else:
+                enemy |= 1 << sq
+    occupied = own | enemy
+    for i, (piece, sq) in enumerate(zip(pieces, squares)):
+        if piece // 6 != side or sq < 0:
+            continue
+        if piece % 6 == PAWN:
+            step = -8 if side == 0 else 8
+            targets = PAWN_ATTACKS[side][sq] & enemy
+            if not occupied & (1 << (sq + step)):
+                targets |= 1 << (sq + step)
+                start_row = 6 if side == 0 else 1
+                if sq // 8 == start_row and not occupied & (1 << (sq + 2 * step)):
+                    targets |= 1 << (sq + 2 * step)
+        else:
+            targets = _attacks(piece, sq, occupied) & ~own
+        for to in iter_squares(targets):
+            captured = squares.index(to) if enemy & (1 << to) else -1
+            if piece % 6 == PAWN and to // 8 in (0, 7):
+                for promotion in (QUEEN, ROOK, BISHOP, KNIGHT):
+                    yield i, to, captured, side * 6 + promotion
+            else:
+                yield i, to, captured, None
+
+
+def _unmoves(pieces, squares, side):
+    # Yield (piece position in the list, origin) of every non-capture move the side could have just played
+    occupied = 0
+    for sq in squares:
+        occupied |= 1 << sq
+    for i, (piece, sq) in enumerate(zip(pieces, squares)):
+        if piece // 6 != side:
+            continue
+        if piece % 6 == PAWN:
+            step = 8 if side == 0 else -8
+            origin = sq + step
+            if 8 <= origin < 56 and not occupied & (1 << origin):
+                yield i, origin
+                double_row = 4 if side == 0 else 3
+                if sq // 8 == double_row and not occupied & (1 << (origin + step)):
+                    yield i, origin + step
+        else:
+            for origin in iter_squares(_attacks(piece, sq, occupied) & ~occupied):
+                yield i, origin
+
+
+def generate_table(material, tables=None):
+    """Solve every position of a material set and return the table as bytes (header included).
+
+    Captures and promotions lead to other material sets, whose tables are read
+    from tables ({name: bytes}) or generated first and added to it. Raises
+    ValueError for material with pawns on both sides (see check_material).
+    """
+    tables = {} if tables is None else tables
+    pieces = check_material(material)
+    name = material_name(pieces)
+    count = len(pieces)
+    size = 2 * 64 ** count
+    weights = [64 ** (count - 1 - i) for i in range(count)]
+    half = 64 ** count
+    values = bytearray(size)
+    valid = bytearray(size)
+    remaining = bytearray(size)
+    cannot_lose = set()
+    conversion_loss = {}
+    pending = {}  # plies -> [(index, win)] results reached through captures and promotions
+    frontier = []
+
+    for index, state in enumerate(itertools.product(range(2), *[range(64)] * count)):
+        side, squares = state[0], list(state[1:])
+        if len(set(squares)) < count or any(
+                piece % 6 == PAWN and sq // 8 in (0, 7) for piece, sq in zip(pieces, squares)):
+            continue
+        if _in_check(1 - side, pieces, squares):
+            continue
+        valid[index] = 1
+        legal = inside = 0
+        best_win = worst_loss = None
+        for i, to, captured, promotion in _moves(pieces, squares, side):
+            child = squares[:]
+            child[i] = to
+            if captured >= 0:
+                child[captured] = -1
+            if _in_check(side, pieces, child):
+                continue
+            legal += 1
+            if captured < 0 and promotion is None:
+                inside += 1
+                continue
+            child_pieces = pieces[:]
+            if promotion is not None:
+                child_pieces[i] = promotion
+            child_name = material_name([piece for piece, sq in zip(child_pieces, child) if sq >= 0])
+            mirrored = material_name([(piece + 6) % 12 for piece, sq in zip(child_pieces, child) if sq >= 0])
+            if child_name not in DRAWN_MATERIAL and child_name not in tables and mirrored not in tables:
+                tables[child_name] = generate_table(child_name, tables)
+            result, plies = _lookup(tables, child_pieces, child, 1 - side)
+            if result == LOSS:
+                best_win = plies + 1 if best_win is None else min(best_win, plies + 1)
+            elif result == DRAW:
+                cannot_lose.add(index)
+            else:
+                worst_loss = plies + 1 if worst_loss is None else max(worst_loss, plies + 1)
+        if not legal:
+            if _in_check(side, pieces, squares):
+                values[index] = 1  # Checkmated: lost in 0 plies
+                frontier.append(index)
+            continue
+        remaining[index] = inside
+        if best_win is not None:
+            cannot_lose.add(index)
+            pending.setdefault(best_win, []).append((index, True))
+        elif worst_loss is not None:
+            conversion_loss[index] = worst_loss
+            if not inside and index not in cannot_lose:
+                pending.setdefault(worst_loss, []).append((index, False))
+
+    plies = 0
+    while frontier or pending:
+        for index, _ in pending.pop(plies, ()):
+            if not values[index]:
+                values[index] = plies + 1
+                frontier.append(index)
+        next_frontier = []
+        for index in frontier:
+            side, squares = divmod(index, half)[0], []
+            rest = index % half
+            for _ in range(count):
+                rest, sq = divmod(rest, 64)
+                squares.append(sq)
+            squares.reverse()
+            mover = 1 - side
+            base = index - side * half + mover * half
+            for i, origin in _unmoves(pieces, squares, mover):
+                parent = base + (origin - squares[i]) * weights[i]
+                if not valid[parent] or values[parent]:
+                    continue
+                if plies % 2 == 0:
+                    # The child is lost for its side to move, so the parent wins by playing into it
+                    values[parent] = plies + 2
+                    next_frontier.append(parent)
+                else:
+                    remaining[parent] -= 1
+                    if not remaining[parent] and parent not in cannot_lose:
+                        loss = max(plies + 1, conversion_loss.get(parent, 0))
+                        if loss == plies + 1:
+                            values[parent] = plies + 2
+                            next_frontier.append(parent)
+                        else:
+                            pending.setdefault(loss, []).append((parent, False))
+        frontier = next_frontier
+        plies += 1
+        if plies > MAX_PLIES:
+            raise ValueError(f"{name} has mates longer than {MAX_PLIES} plies")
+    return HEADER.pack(MAGIC, count, name.encode('ascii')) + bytes(values)
+
+
+def write_table(directory, material, data):
+    """Write a generated table as <material>.tb in directory and return its path."""
+    path = os.path.join(directory, material_name(material_pieces(material)) + EXTENSION)
+    with open(path, 'wb') as table:
+        table.write(data)
+    return path
+
+
+class Tablebases:
+    """Every table of a directory, memory-mapped and probed in constant time.
+
+    Use it as a context manager, or call close() once it is no longer needed.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.files = []
+        self.tables = {}
+        self.max_pieces = 0
+        for file_name in sorted(os.listdir(directory)):
+            if not file_name.endswith(EXTENSION):
+                continue
+            table_file = open(os.path.join(directory, file_name), 'rb')
+            data = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, count, name = HEADER.unpack_from(data)
+            name = name.rstrip(b'\0').decode('ascii')
+            if magic != MAGIC or len(data) != HEADER.size + 2 * 64 ** count:
+                data.close()
+                table_file.close()
+                raise ValueError(f"{file_name} is not an endgame table")
+            self.files.append((table_file, data))
+            self.tables[name] = data
+            self.max_pieces = max(self.max_pieces, count)
+
+    def probe(self, position):
+        """Return (result, plies to mate) for the side to move, or None when no table covers the position.
+
+        result is WIN, DRAW or LOSS; plies is 0 for a draw.
+        """
+        occupied = position.occupied
+        if position.castling or bin(occupied).count('1') > self.max_pieces:
+            return None
+        pieces, squares = [], []
+        for piece, bb in enumerate(position.pieces):
+            for sq in iter_squares(bb):
+                pieces.append(piece)
+                squares.append(sq)
+        try:
+            return _lookup(self.tables, pieces, squares, 0 if position.white_turn else 1)
+        except KeyError:
+            return None
+
+    def best_move(self, position):
+        """Return the move keeping the best result (fastest win, slowest loss), or None when not covered."""
+        if self.probe(position) is None:
+            return None
+        best, best_rank = None, None
+        for move in generate_legal_moves(position):
+            position.make_move(move)
+            if generate_legal_moves(position):
+                entry = self.probe(position)
+            else:
+                entry = (LOSS, 0) if position.in_check() else (DRAW, 0)
+            position.unmake_move()
+            if entry is None:
+                continue
+            result, plies = entry
+            # Rank from the mover's point of view: winning quickly first, losing slowly last
+            rank = (-result, -plies if result == LOSS else plies)
+            if best_rank is None or rank > best_rank:
+                best, best_rank = move, rank
+        return best
+
+    def close(self):
+        for table_file, data in self.files:
+            data.close()
+            table_file.close()
+        self.files = []
+        self.tables = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,56 @@
+# --- Table de transposition ---
+
+class TranspositionTable:
+    """Fixed-size table of per-position results indexed by Zobrist key.
+
+    The table has 2**size_bits slots and never grows. Each slot keeps one
+    entry; a new entry replaces the stored one when the slot is empty, holds
+    the same position, was written in an older generation, or was computed
+    to a smaller depth than the new one.
+    """
+
+    __slots__ = ('mask', 'keys', 'depths', 'generations', 'values', 'generation')
+
+    def __init__(self, size_bits=16):
+        size = 1 << size_bits
+        self.mask = size - 1
+        self.keys = [None] * size
+        self.depths = [0] * size
+        self.generations = [0] * size
+        self.values = [None] * size
+        self.generation = 0
+
+    def probe(self, key, depth=0):
+        """Return the value stored for key if it was computed to at least depth, else None."""
+        index = key & self.mask
+        if self.keys[index] == key and self.depths[index] >= depth:
+            return self.values[index]
+        return None
+
+    def store(self, key, value, depth=0):
+        """Store a value for key, following the replacement policy."""
+        index = key & self.mask
+        stored = self.keys[index]
+        if (stored is not None and stored != key and self.generations[index] == self.generation
+                and self.depths[index] > depth):
+            return
+        self.keys[index] = key
+        self.depths[index] = depth
+        self.generations[index] = self.generation
+        self.values[index] = value
+
+    def new_generation(self):
+        """Age every stored entry so that new results may replace them."""
+        self.generation += 1
+
+    def clear(self):
+        """Remove every entry."""
+        size = self.mask + 1
+        self.keys = [None] * size
+        self.depths = [0] * size
+        self.generations = [0] * size
+        self.values = [None] * size
+        self.generation = 0
+
+    def __len__(self):
+        return len(self.keys) - self.keys.count(None)
@@ -0,0 +1,12 @@
+import random
+
+# --- Clés de Zobrist ---
+# Fixed seed so that keys (and anything stored under them) are stable across runs
+_rng = random.Random(0x5EED_C4E55)
+
+PIECE_KEYS = [[_rng.getrandbits(64) for _ in range(64)] for _ in range(12)]
+SIDE_KEY = _rng.getrandbits(64)  # Present when black is to move
+CASTLING_KEYS = [_rng.getrandbits(64) for _ in range(16)]
+EP_FILE_KEYS = [_rng.getrandbits(64) for _ in range(8)]
+
+del _rng
@@ -0,0 +1,197 @@
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import sys
+
+from rules.draws import STALEMATE, DrawTracker
+from rules.fen import START_FEN
+from rules.movegen import generate_legal_moves
+from rules.position import move_to_uci
+from rules.state import GameState
+
+DEFAULT_HOST, DEFAULT_PORT = "127.0.0.1", 8765
+DEFAULT_QUEUE_SIZE = 64  # Requests read ahead per connection before the server stops reading it
+MAX_LINE = 4096  # Longest request line accepted, in bytes
+ONGOING, CHECKMATE = "ongoing", "checkmate"
+
+logger = logging.getLogger(__name__)
+
+
+class ProtocolError(Exception):
+    """A request the server cannot answer; the message is sent back to the client."""
+
+
+class ServerGame:
+    """One game hosted by the server: its position, legal moves and draw history."""
+
+    __slots__ = ('position', 'moves', 'draws', 'fullmove_number', 'result')
+
+    def __init__(self, position, halfmove_clock=0, fullmove_number=1):
+        self.position = position
+        self.fullmove_number = fullmove_number
+        self.moves = {move_to_uci(move): move for move in generate_legal_moves(position)}
+        self.draws = DrawTracker(position, halfmove_clock)
+        self.result = self._result()
+
+    def _result(self):
+        if not self.moves:
+            return CHECKMATE if self.position.in_check() else STALEMATE
+        return self.draws.rule_draw() or ONGOING
+
+    def play(self, uci):
+        """Play a move given in coordinate notation, or raise ProtocolError if it is not legal."""
+        if self.result != ONGOING:
+            raise ProtocolError(f"the game is over ({self.result})")
+        move = self.moves.get(uci)
+        if move is None:
+            raise ProtocolError(f"illegal move {uci!r}")
+        self.position.make_move(move)
+        if self.position.white_turn:
+            self.fullmove_number += 1  # Black has just moved
+        self.moves = {move_to_uci(move): move for move in generate_legal_moves(self.position)}
+        self.draws.push(self.position)
+        # Moves are never taken back here, so a long game must not keep its undo records
+        self.position.undo_stack.clear()
+        self.result = self._result()
+
+    def reply(self, legal=False):
+        reply = {"fen": self.position.to_fen(self.draws.halfmove_clock, self.fullmove_number), "result": self.result}
+        if legal:
+            reply["moves"] = list(self.moves)
+        return reply
+
+
+class GameServer:
+    """Hosts any number of games for the clients connected to it.
+
+    Every connection gets its own games and a bounded queue of pending requests:
+    when a client sends faster than its requests are answered, the server stops
+    reading its socket until the queue has room again.
+    """
+
+    def __init__(self, queue_size=DEFAULT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.game_ids = itertools.count(1)
+        self.games = 0
+        self.moves = 0
+
+    async def handle_connection(self, reader, writer):
+        queue = asyncio.Queue(self.queue_size)
+        games = {}
+        worker = asyncio.create_task(self._answer(queue, games, writer))
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    break  # Line over the limit, or the client went away
+                if not line:
+                    break
+                await queue.put(line)
+            await queue.put(None)
+            await worker
+        finally:
+            worker.cancel()
+            self.games -= len(games)
+            writer.close()
+
+    async def _answer(self, queue, games, writer):
+        while True:
+            line = await queue.get()
+            if line is None:
+                return
+            writer.write(json.dumps(self.respond(line, games)).encode() + b"\n")
+            if queue.empty():
+                # Answers to pipelined requests are flushed together
+                try:
+                    await writer.drain()
+                except ConnectionError:
+                    return
+
+    def respond(self, line, games):
+        """Return the reply to one request line of a connection owning games."""
+        request_id = None
+        try:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                raise ProtocolError("invalid JSON") from None
+            if not isinstance(request, dict):
+                raise ProtocolError("a request must be a JSON object")
+            request_id = request.get("id")
+            reply = self.dispatch(request, games)
+            reply["ok"] = True
+        except ProtocolError as error:
+            reply = {"ok": False, "error": str(error)}
+        except Exception as error:
+            # A bug must cost the client one request, not its connection and games
+            logger.exception("Request %r failed", line)
+            reply = {"ok": False, "error": f"internal error: {type(error).__name__}"}
+        if request_id is not None:
+            reply["id"] = request_id
+        return reply
+
+    def dispatch(self, request, games):
+        op = request.get("op")
+        legal = bool(request.get("legal"))
+        if op == "new":
+            fen = request.get("fen") or START_FEN
+            if not isinstance(fen, str):
+                raise ProtocolError("the fen must be a string")
+            try:
+                state = GameState.from_fen(fen)
+            except ValueError as error:
+                raise ProtocolError(str(error)) from None
+            game_id = next(self.game_ids)
+            games[game_id] = ServerGame(state.position(), state.halfmove_clock, state.fullmove_number)
+            self.games += 1
+            return dict(games[game_id].reply(legal), game=game_id)
+        game_id = request.get("game")
+        if not isinstance(game_id, int) or isinstance(game_id, bool):
+            raise ProtocolError("the game must be the number returned by 'new'")
+        game = games.get(game_id)
+        if game is None:
+            raise ProtocolError(f"no game {game_id!r} on this connection")
+        if op == "move":
+            move = request.get("move")
+            if not isinstance(move, str):
+                raise ProtocolError("the move must be a string such as 'e2e4'")
+            game.play(move)
+            self.moves += 1
+            return game.reply(legal)
+        if op == "state":
+            return game.reply(legal)
+        if op == "close":
+            del games[game_id]
+            self.games -= 1
+            return {"game": game_id}
+        raise ProtocolError(f"unknown op {op!r}")
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, queue_size=DEFAULT_QUEUE_SIZE):
+    game_server = GameServer(queue_size)
+    server = await asyncio.start_server(game_server.handle_connection, host, port, limit=MAX_LINE)
+    logger.info("Serving on %s", ", ".join(str(sock.getsockname()) for sock in server.sockets))
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Host many chess games over TCP (one JSON request per line).")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"address to listen on (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE,
+                        help=f"requests read ahead per connection (default: {DEFAULT_QUEUE_SIZE})")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    try:
+        asyncio.run(serve(args.host, args.port, args.queue_size))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+import argparse
+import importlib
+import os
+import random
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from engine import Searcher
+from rules.archive import ArchiveWriter
+from rules.draws import STALEMATE, DrawTracker
+from rules.fen import START_FEN
+from rules.movegen import generate_legal_moves
+from rules.state import GameState
+
+RANDOM, ENGINE = 'random', 'engine'
+DEFAULT_MOVE_TIME = 0.1  # Seconds a player may spend on each move
+TIME_GRACE = 0.05  # Overrun tolerated before a move counts as played out of time
+DEFAULT_MAX_PLIES = 400  # Games still going after this many half-moves are adjudicated drawn
+CHECKMATE, MAX_PLIES, TIME_FORFEIT, ILLEGAL_MOVE, ERROR = (
+    'checkmate', 'max plies', 'time forfeit', 'illegal move', 'error')
+PHASES = ("move generation", "status detection", "players")
+# Players are interrupted by a timer signal, where the platform has one; elsewhere a
+# slow move is only detected once it is played
+CAN_INTERRUPT = hasattr(signal, 'setitimer')
+
+
+class MoveTimeout(BaseException):
+    """Raised inside a player still thinking when its time for the move is up.
+
+    Like KeyboardInterrupt, it is not an Exception, so that a player catching
+    its own errors does not swallow it.
+    """
+
+
+def _time_up(signum, frame):
+    raise MoveTimeout
+
+
+def move_in_time(mover, position, moves, limit, interrupt):
+    """Return the move chosen by a player; with interrupt, raise MoveTimeout after limit seconds.
+
+    interrupt needs _time_up installed as the SIGALRM handler, which play_game
+    does once per game in the main thread of its process.
+    """
+    if not interrupt:
+        return mover(position, moves)
+    signal.setitimer(signal.ITIMER_REAL, limit)
+    try:
+        return mover(position, moves)
+    finally:
+        # A signal arriving in here still raises MoveTimeout: the move did take too long
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def random_player(position, moves, rng):
+    """Move-selection function playing a uniformly random legal move."""
+    return rng.choice(moves)
+
+
+def make_player(spec, move_time, rng):
+    """Return a function (position, moves) -> move for a player specification.
+
+    spec is RANDOM, ENGINE, or 'module:function' naming any move-selection
+    function called as function(position, moves, rng), which must return one
+    of the legal moves and leave the position unchanged.
+    """
+    if spec == RANDOM:
+        return lambda position, moves: random_player(position, moves, rng)
+    if spec == ENGINE:
+        searcher = Searcher(table_bits=16)
+        return lambda position, moves: searcher.search(position, move_time).move
+    module_name, _, function_name = spec.partition(':')
+    function = getattr(importlib.import_module(module_name), function_name)
+    return lambda position, moves: function(position, moves, rng)
+
+
+def play_game(task):
+    """Play one game in a worker and return (number, result, reason, moves, phase timings, error)."""
+    number, fen, players, move_time, max_plies, seed = task
+    rng = random.Random(f"{seed}:{number}" if seed is not None else None)
+    state = GameState.from_fen(fen)
+    position = state.position()
+    draws = DrawTracker(position, state.halfmove_clock)
+    timings = [0.0] * len(PHASES)
+    played = []
+    result, reason, error = '1/2-1/2', MAX_PLIES, ''
+    # Signal handlers can only be installed from the main thread, as in the pool workers
+    interrupt = CAN_INTERRUPT and threading.current_thread() is threading.main_thread()
+    previous_handler = signal.signal(signal.SIGALRM, _time_up) if interrupt else None
+    try:
+        movers = [make_player(spec, move_time, rng) for spec in players]
+        for _ in range(max_plies + 1):
+            start = time.perf_counter()
+            moves = generate_legal_moves(position)
+            generated = time.perf_counter()
+            if moves:
+                ending = draws.rule_draw()
+            else:
+                ending = CHECKMATE if position.in_check() else STALEMATE
+            done = time.perf_counter()
+            timings[0] += generated - start
+            timings[1] += done - generated
+            if ending is not None:
+                reason = ending
+                if ending == CHECKMATE:
+                    result = '0-1' if position.white_turn else '1-0'
+                break
+            if len(played) == max_plies:
+                break
+            loser = '0-1' if position.white_turn else '1-0'
+            try:
+                move = move_in_time(movers[0 if position.white_turn else 1], position, moves,
+                                    move_time + TIME_GRACE, interrupt)
+                timed_out = False
+            except MoveTimeout:
+                # The player was stopped and may have left the position half-searched: the game ends here
+                move, timed_out = None, True
+            elapsed = time.perf_counter() - done
+            timings[2] += elapsed
+            if timed_out or elapsed > move_time + TIME_GRACE:
+                result, reason = loser, TIME_FORFEIT
+                break
+            if move not in moves:
+                result, reason = loser, ILLEGAL_MOVE
+                break
+            position.make_move(move)
+            draws.push(position)
+            played.append(move)
+    except Exception as exc:
+        # A crash in the rules or a player is reported with the position it happened in
+        result, reason, error = '*', ERROR, f"{type(exc).__name__}: {exc} ({position.to_fen()})"
+    finally:
+        if interrupt:
+            signal.signal(signal.SIGALRM, previous_handler)
+    return number, result, reason, played, timings, error
+
+
+def read_openings(path):
+    """Return the FEN strings of a file holding one position per line ('#' starts a comment)."""
+    openings = []
+    with open(path, encoding="utf-8") as lines:
+        for line in lines:
+            fen = line.split('#', 1)[0].strip()
+            if fen:
+                GameState.from_fen(fen)  # Rejects a malformed FEN or an illegal position
+                openings.append(fen)
+    if not openings:
+        raise ValueError(f"{path} holds no position")
+    return openings
+
+
+def game_tasks(games, openings, players, move_time, max_plies, seed):
+    # Every opening is played twice, the players swapping colours
+    for number in range(games):
+        fen = openings[number // 2 % len(openings)]
+        pair = players if number % 2 == 0 else players[::-1]
+        yield number, fen, pair, move_time, max_plies, seed
+
+
+def run_tournament(tasks, workers=None):
+    """Yield the outcome of every game task, playing them in parallel over a process pool."""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        yield from map(play_game, tasks)
+        return
+    with ProcessPoolExecutor(workers) as executor:
+        yield from executor.map(play_game, tasks, chunksize=4)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play games between two players without a window and report "
+                                                 "the results, games/second and the time spent in the rules.")
+    parser.add_argument("players", nargs=2, metavar="PLAYER",
+                        help=f"'{RANDOM}', '{ENGINE}' or module:function (a move-selection function "
+                             "called with position, legal moves and a random generator)")
+    parser.add_argument("--games", type=int, default=100, help="games to play (default: 100)")
+    parser.add_argument("--openings", help="file of starting positions, one FEN per line "
+                                           "(default: the initial position)")
+    parser.add_argument("--move-time", type=float, default=DEFAULT_MOVE_TIME,
+                        help=f"seconds per move; a slower move loses the game (default: {DEFAULT_MOVE_TIME})")
+    parser.add_argument("--max-plies", type=int, default=DEFAULT_MAX_PLIES,
+                        help=f"half-moves after which a game is drawn (default: {DEFAULT_MAX_PLIES})")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--seed", type=int, help="random seed, for repeatable tournaments")
+    parser.add_argument("--archive", help="also store the games in this binary archive (see rules.archive)")
+    args = parser.parse_args(argv)
+    for spec in args.players:
+        if spec not in (RANDOM, ENGINE):
+            module_name, _, function_name = spec.partition(':')
+            try:
+                if not callable(getattr(importlib.import_module(module_name), function_name)):
+                    parser.error(f"{spec} is not a function")
+            except (ImportError, AttributeError, ValueError) as error:
+                parser.error(f"player {spec!r}: {error}")
+    try:
+        openings = read_openings(args.openings) if args.openings else [START_FEN]
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+
+    tasks = game_tasks(args.games, openings, tuple(args.players), args.move_time, args.max_plies, args.seed)
+    wins = [0, 0]  # Games won by each player, whatever the colour
+    endings = Counter()
+    timings = [0.0] * len(PHASES)
+    plies = positions = 0
+    archive = ArchiveWriter(args.archive) if args.archive else None
+    start = time.perf_counter()
+    for number, result, reason, moves, game_timings, error in run_tournament(tasks, args.workers):
+        white, black = args.players if number % 2 == 0 else args.players[::-1]
+        if result in ('1-0', '0-1'):
+            wins[(number + (result == '0-1')) % 2] += 1
+        endings[reason] += 1
+        plies += len(moves)
+        positions += len(moves) + 1
+        timings = [total + spent for total, spent in zip(timings, game_timings)]
+        if error:
+            print(f"game {number}: {error}", file=sys.stderr)
+        if archive is not None:
+            fen = openings[number // 2 % len(openings)]
+            headers = {"Round": str(number + 1), "White": white, "Black": black, "Termination": reason}
+            if fen != START_FEN:
+                headers["FEN"] = fen
+            archive.add(moves, result, headers)
+    elapsed = time.perf_counter() - start
+    if archive is not None:
+        archive.close()
+
+    print(f"{args.games} games in {elapsed:.2f}s  {args.games / elapsed if elapsed > 0 else 0.0:.1f} games/s  "
+          f"{plies / elapsed if elapsed > 0 else 0.0:.0f} moves/s", file=sys.stderr)
+    draws = args.games - wins[0] - wins[1] - endings[ERROR]
+    print(f"{args.players[0]} vs {args.players[1]}: +{wins[0]} -{wins[1]} ={draws}  "
+          f"score {100 * (wins[0] + draws / 2) / max(args.games, 1):.1f}%", file=sys.stderr)
+    print("endings: " + ", ".join(f"{reason} {count}" for reason, count in endings.most_common()), file=sys.stderr)
+    print("time in each phase, summed over the workers:", file=sys.stderr)
+    for phase, spent in zip(PHASES, timings):
+        calls = plies if phase == "players" else positions
+        print(f"  {phase:<17} {spent:8.3f}s  {1e6 * spent / max(calls, 1):8.1f} µs per call", file=sys.stderr)
+    return 1 if endings[ERROR] or endings[ILLEGAL_MOVE] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
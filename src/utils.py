@@ -1,18 +1,72 @@
+import logging
+import os
+
 import pygame
 
-def load_images():
-    pieces = {
-        'k': pygame.image.load("../assets/img/king_black.png"),
-        'K': pygame.image.load("../assets/img/king_white.png"),
-        'q': pygame.image.load("../assets/img/queen_black.png"),
-        'Q': pygame.image.load("../assets/img/queen_white.png"),
-        'b': pygame.image.load("../assets/img/bishop_black.png"),
-        'B': pygame.image.load("../assets/img/bishop_white.png"),
-        'n': pygame.image.load("../assets/img/knight_black.png"),
-        'N': pygame.image.load("../assets/img/knight_white.png"),
-        'r': pygame.image.load("../assets/img/rook_black.png"),
-        'R': pygame.image.load("../assets/img/rook_white.png"),
-        'p': pygame.image.load("../assets/img/pawn_black.png"),
-        'P': pygame.image.load("../assets/img/pawn_white.png"),
-    }
-    return pieces
+from board import SQUARE_SIZE
+
+# --- Ressources ---
+# Paths are resolved from this file, so the game starts from any working directory
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'assets')
+IMAGE_DIR = os.path.join(ASSETS_DIR, 'img')
+CACHE_DIR = os.path.join(ASSETS_DIR, 'cache')
+PIECE_NAMES = {'k': 'king', 'q': 'queen', 'b': 'bishop', 'n': 'knight', 'r': 'rook', 'p': 'pawn'}
+PIECE_ORDER = 'KQBNRPkqbnrp'  # Order of the sprites in the atlas, left to right
+PIECE_SCALE = 0.8  # Share of a square a piece covers (the original art is 60 px for 75 px squares)
+
+logger = logging.getLogger(__name__)
+
+def piece_path(piece):
+    """Return the path of the source image of a piece ('K', 'p', ...)."""
+    color = 'white' if piece.isupper() else 'black'
+    return os.path.join(IMAGE_DIR, f"{PIECE_NAMES[piece.lower()]}_{color}.png")
+
+def atlas_path(size):
+    return os.path.join(CACHE_DIR, f"pieces_{size}.png")
+
+def load_images(square_size=SQUARE_SIZE, use_cache=True):
+    """Return the piece sprites, scaled for square_size and converted to the display format.
+
+    The display mode must be set first. The 12 sprites are packed side by side
+    in a single atlas image, cached under assets/cache and rebuilt whenever a
+    source image is newer, so later starts read one file instead of twelve.
+    """
+    size = round(square_size * PIECE_SCALE)
+    atlas = load_atlas(size) if use_cache else None
+    if atlas is None:
+        atlas = build_atlas(size)
+        if use_cache:
+            save_atlas(atlas, size)
+    # Converted once here, so blits never convert pixel formats during a frame
+    atlas = atlas.convert_alpha()
+    return {piece: atlas.subsurface((index * size, 0, size, size)) for index, piece in enumerate(PIECE_ORDER)}
+
+def build_atlas(size):
+    """Load and scale every piece image into one strip of size x size sprites."""
+    atlas = pygame.Surface((size * len(PIECE_ORDER), size), pygame.SRCALPHA)
+    for index, piece in enumerate(PIECE_ORDER):
+        image = pygame.image.load(piece_path(piece))
+        if image.get_size() != (size, size):
+            image = pygame.transform.smoothscale(image, (size, size))
+        # MAX onto the transparent atlas copies the pixels and their alpha unchanged
+        atlas.blit(image, (index * size, 0), special_flags=pygame.BLEND_RGBA_MAX)
+    return atlas
+
+def load_atlas(size):
+    """Return the cached atlas for size, or None when it is missing or older than a source image."""
+    path = atlas_path(size)
+    try:
+        built = os.path.getmtime(path)
+        if any(os.path.getmtime(piece_path(piece)) > built for piece in PIECE_ORDER):
+            return None
+        return pygame.image.load(path)
+    except (OSError, pygame.error):
+        return None
+
+def save_atlas(atlas, size):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        pygame.image.save(atlas, atlas_path(size))
+    except (OSError, pygame.error) as error:
+        # A read-only install still works, it just rebuilds the atlas at every start
+        logger.warning("Could not cache the piece atlas: %s", error)
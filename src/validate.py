@@ -0,0 +1,98 @@
+import argparse
+import csv
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+from rules.pgn import IllegalMoveError, read_games, replay_game
+
+DEFAULT_CHUNK_SIZE = 200  # Games sent to a worker at once, to keep the pickling overhead low
+REPORT_COLUMNS = ("game", "line", "status", "result", "final_position", "error_ply", "error")
+
+
+def position_fields(fen):
+    # Placement, side, castling and en passant: the move counters are not tracked
+    return ' '.join(fen.split()[:4])
+
+
+def validate_game(game):
+    """Replay one game and return its report row (without the game number)."""
+    try:
+        position = replay_game(game)
+    except IllegalMoveError as error:
+        return game.line, "illegal", game.result, position_fields(error.fen), error.ply, str(error)
+    except ValueError as error:
+        return game.line, "invalid start", game.result, "", "", str(error)
+    return game.line, "ok", game.result, position_fields(position.to_fen()), "", ""
+
+
+def validate_chunk(games):
+    """Validate a list of games in a worker process."""
+    return [validate_game(game) for game in games]
+
+
+def chunked(games, size):
+    chunk = []
+    for game in games:
+        chunk.append(game)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def validate_games(games, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield the report row of every game in input order, validating chunks of games in parallel."""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        rows = map(validate_game, games)
+    else:
+        rows = _validate_in_pool(games, workers, chunk_size)
+    for number, row in enumerate(rows, 1):
+        yield (number,) + row
+
+
+def _validate_in_pool(games, workers, chunk_size):
+    with ProcessPoolExecutor(workers) as executor:
+        # Keep a few chunks in flight per worker so the file is read only as fast as it is validated
+        pending = deque()
+        for chunk in chunked(games, chunk_size):
+            pending.append(executor.submit(validate_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay every game of a PGN file and report the illegal ones.")
+    parser.add_argument("pgn", help="PGN file to validate")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"games per worker task (default: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("--output", help="CSV report file (default: standard output)")
+    parser.add_argument("--encoding", default="utf-8", help="encoding of the PGN file (default: utf-8)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    games = invalid = 0
+    report = open(args.output, "w", newline="", encoding="utf-8") if args.output else nullcontext(sys.stdout)
+    with open(args.pgn, encoding=args.encoding, errors="replace") as pgn, report as output:
+        writer = csv.writer(output)
+        writer.writerow(REPORT_COLUMNS)
+        for row in validate_games(read_games(pgn), args.workers, args.chunk_size):
+            writer.writerow(row)
+            games += 1
+            invalid += row[2] != "ok"
+    elapsed = time.perf_counter() - start
+    print(f"{games} games, {invalid} invalid  {elapsed:.3f}s  {games / elapsed if elapsed > 0 else 0.0:.0f} games/s",
+          file=sys.stderr)
+    return 1 if invalid else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The modules live flat in src/ and are run from there, like the scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
@@ -0,0 +1,75 @@
+import pytest
+
+from rules.archive import ArchiveWriter, GameArchive
+from rules.fen import START_FEN
+from rules.pgn import IllegalMoveError, read_games
+
+PGN = """[Event "Opera"]
+[White "Morphy"]
+[Black "Duke and Count"]
+[Result "1-0"]
+
+1. e4 e5 2. Nf3 d6 3. d4 Bg4 4. dxe5 Bxf3 5. Qxf3 dxe5 6. Bc4 Nf6 7. Qb3 Qe7
+8. Nc3 c6 9. Bg5 b5 10. Nxb5 cxb5 11. Bxb5+ Nbd7 12. O-O-O Rd8 13. Rxd7 Rxd7
+14. Rd1 Qe6 15. Bxd7+ Nxd7 16. Qb8+ Nxb8 17. Rd8# 1-0
+
+[Event "Promotion"]
+[FEN "8/P7/8/8/8/8/8/k1K5 w - - 0 1"]
+[Result "*"]
+
+1. a8=N *
+
+[Event "Broken"]
+[Result "*"]
+
+1. e4 e5 2. Ke3 *
+"""
+
+
+@pytest.fixture
+def archive_path(tmp_path):
+    path = str(tmp_path / "games.pca")
+    with ArchiveWriter(path) as writer:
+        games = list(read_games(PGN.splitlines(keepends=True)))
+        writer.add_game(games[0])
+        writer.add_game(games[1])
+        with pytest.raises(IllegalMoveError) as error:
+            writer.add_game(games[2])
+        assert error.value.ply == 3
+        writer.add([], '1/2-1/2', {})
+    return path
+
+
+def test_round_trip(archive_path):
+    with GameArchive(archive_path) as archive:
+        assert len(archive) == 3
+        assert archive.result(0) == '1-0'
+        assert archive.headers(0)["White"] == "Morphy"
+        assert len(archive.moves(0)) == 33
+        assert archive.position(0).to_fen().startswith("1n1Rkb1r/p4ppp/4q3/4p1B1/4P3/8/PPP2PPP/2K5 b k")
+        assert archive.position(0, 2).to_fen() == "rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq e6 0 1"
+
+
+def test_start_position_and_promotion(archive_path):
+    with GameArchive(archive_path) as archive:
+        assert archive.start_position(1).to_fen() == "8/P7/8/8/8/8/8/k1K5 w - - 0 1"
+        assert archive.position(1).to_fen() == "N7/8/8/8/8/8/8/k1K5 b - - 0 1"
+        assert archive.start_position(2).to_fen() == START_FEN
+        assert archive.headers(2) == {}
+        assert archive.moves(2) == ()
+
+
+def test_out_of_range(archive_path):
+    with GameArchive(archive_path) as archive:
+        with pytest.raises(IndexError):
+            archive.moves(3)
+
+
+def test_not_an_archive(tmp_path):
+    path = tmp_path / "empty.pca"
+    path.write_bytes(b"")
+    with pytest.raises(ValueError, match="empty"):
+        GameArchive(str(path))
+    path.write_bytes(b"PGN!" + bytes(40))
+    with pytest.raises(ValueError, match="not a game archive"):
+        GameArchive(str(path))
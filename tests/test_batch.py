@@ -0,0 +1,50 @@
+import random
+
+import pytest
+
+from perft import SUITE
+from rules.game import init_board
+from rules.movegen import generate_legal_moves
+from rules.position import BLACK, WHITE, Position
+
+np = pytest.importorskip("numpy")
+from rules.batch import evaluate, pack_boards, pack_positions  # Only once NumPy is known to be there
+
+
+def random_positions(count_per_fen=30, seed=1):
+    # Positions reached by random play from the perft suite, with checks, pins, castling and en passant
+    rng = random.Random(seed)
+    positions = []
+    for _, fen, _ in SUITE:
+        position = Position.from_fen(fen)
+        for _ in range(count_per_fen):
+            positions.append(Position.from_fen(position.to_fen()))
+            moves = generate_legal_moves(position)
+            if not moves:
+                break
+            position.make_move(rng.choice(moves))
+    return positions
+
+
+def test_evaluate_matches_position():
+    positions = random_positions()
+    in_check, attacks, move_counts = evaluate(*pack_positions(positions))
+    for index, position in enumerate(positions):
+        fen = position.to_fen()
+        assert bool(in_check[index]) == position.in_check(), fen
+        assert int(attacks[index, 0]) == position.attack_maps[WHITE], fen
+        assert int(attacks[index, 1]) == position.attack_maps[BLACK], fen
+        assert int(move_counts[index]) == len(generate_legal_moves(position)), fen
+
+
+def test_pack_boards_matches_pack_positions():
+    board = init_board()[0]
+    codes, _, _, _ = pack_positions([Position.from_board(board)])
+    assert np.array_equal(pack_boards([board, board]), np.vstack([codes, codes]))
+
+
+def test_scalar_arguments_broadcast():
+    board = init_board()[0]
+    in_check, _, move_counts = evaluate(pack_boards([board] * 3), True, 15, -1)
+    assert not in_check.any()
+    assert move_counts.tolist() == [20, 20, 20]
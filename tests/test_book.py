@@ -0,0 +1,88 @@
+import random
+
+import pytest
+
+from engine.book import RECORD, OpeningBook, build_book, write_book
+from rules.fen import START_FEN
+from rules.pgn import parse_san, read_games
+from rules.position import Position, move_to_uci
+
+PGN = """[Result "1-0"]
+
+1. e4 e5 2. Nf3 1-0
+
+[Result "0-1"]
+
+1. e4 c5 0-1
+
+[Result "1/2-1/2"]
+
+1. d4 d5 1/2-1/2
+
+[Result "1-0"]
+
+1. e4 e5 2. Qh5 1-0
+"""
+
+
+def book_moves(book, position):
+    return [(move_to_uci(move), weight) for move, weight in book.moves(position)]
+
+
+@pytest.fixture
+def book_path(tmp_path):
+    path = str(tmp_path / "book.bin")
+    write_book(path, build_book(read_games(PGN.splitlines(keepends=True)), max_plies=3))
+    return path
+
+
+def test_weights_follow_the_results(book_path):
+    with OpeningBook(book_path) as book:
+        position = Position.from_fen(START_FEN)
+        # e4: won twice (2 + 2), lost once (0); d4: drawn (1)
+        assert book_moves(book, position) == [("e2e4", 4), ("d2d4", 1)]
+        position.make_move(parse_san(position, "e4"))
+        # e5 only lost: it stays in the file with weight 0 but is never offered
+        assert book_moves(book, position) == [("c7c5", 2)]
+        position.make_move(parse_san(position, "e5"))
+        # Past max_plies nothing is recorded
+        position.make_move(parse_san(position, "Nf3"))
+        assert book_moves(book, position) == []
+
+
+def test_choose_never_picks_a_zero_weight(book_path):
+    with OpeningBook(book_path) as book:
+        position = Position.from_fen(START_FEN)
+        position.make_move(parse_san(position, "e4"))
+        rng = random.Random(1)
+        assert {book.choose(position, rng) for _ in range(20)} == {parse_san(position, "c5")}
+        assert book.choose(Position.from_fen("4k3/8/8/8/8/8/8/4K3 w - - 0 1"), rng) is None
+
+
+def test_illegal_entries_are_filtered(tmp_path):
+    path = str(tmp_path / "book.bin")
+    position = Position.from_fen(START_FEN)
+    write_book(path, {(position.key, parse_san(position, "Nf3")): 3, (position.key, 0): 9})
+    with OpeningBook(path) as book:
+        assert len(book.probe(position.key)) == 2
+        assert book_moves(book, position) == [("g1f3", 3)]
+
+
+def test_weights_are_scaled_to_16_bits(tmp_path):
+    path = str(tmp_path / "book.bin")
+    write_book(path, {(1, 10): 200000, (1, 20): 100000, (2, 30): 7})
+    with OpeningBook(path) as book:
+        assert book.probe(1) == [(10, 50000), (20, 25000)]
+        assert book.probe(3) == []
+
+
+def test_empty_and_invalid_books(tmp_path):
+    empty = tmp_path / "empty.bin"
+    empty.write_bytes(b"")
+    with OpeningBook(str(empty)) as book:
+        assert len(book) == 0
+        assert book.probe(1) == []
+    invalid = tmp_path / "invalid.bin"
+    invalid.write_bytes(bytes(RECORD.size + 1))
+    with pytest.raises(ValueError):
+        OpeningBook(str(invalid))
@@ -0,0 +1,55 @@
+from rules.draws import FIFTY_MOVES, REPETITION, DrawTracker
+from rules.fen import START_FEN
+from rules.pgn import parse_san
+from rules.position import Position
+
+
+def play(sans, fen=START_FEN, halfmove_clock=0):
+    # Play SAN moves from a position, recording each one; return the tracker and the reasons seen
+    position = Position.from_fen(fen)
+    draws = DrawTracker(position, halfmove_clock)
+    reasons = []
+    for san in sans:
+        position.make_move(parse_san(position, san))
+        draws.push(position)
+        reasons.append(draws.rule_draw())
+    return draws, reasons
+
+
+def test_threefold_repetition():
+    draws, reasons = play(['Nf3', 'Nf6', 'Ng1', 'Ng8'] * 2)
+    assert reasons[:7] == [None] * 7
+    assert reasons[7] == REPETITION
+    assert draws.counts[draws.key] == 3
+
+
+def test_repetition_counts_positions_not_move_sequences():
+    # The start position comes back through two different knight tours
+    _, reasons = play(['Nf3', 'Nf6', 'Ng1', 'Ng8', 'Nc3', 'Nc6', 'Nb1', 'Nb8'])
+    assert reasons == [None] * 7 + [REPETITION]
+
+
+def test_pawn_move_clears_the_history():
+    draws, reasons = play(['Nf3', 'Nf6', 'Ng1', 'Ng8', 'e4', 'e5'] + ['Nf3', 'Nf6', 'Ng1', 'Ng8'])
+    assert draws.halfmove_clock == 4
+    assert REPETITION not in reasons
+
+
+def test_fifty_move_rule_from_the_fen_clock():
+    fen = "8/8/4k3/8/8/4K3/8/R7 w - - 97 80"
+    draws, reasons = play(['Ra2', 'Kd6', 'Ra1'], fen, 97)
+    assert reasons == [None, None, FIFTY_MOVES]
+    assert draws.halfmove_clock == 100
+
+
+def test_capture_resets_the_clock():
+    draws, _ = play(['e4', 'd5', 'exd5'], START_FEN)
+    assert draws.halfmove_clock == 0
+
+
+def test_explicit_clock_wins_over_the_undo_record():
+    position = Position.from_fen(START_FEN)
+    draws = DrawTracker(position)
+    position.make_move(parse_san(position, 'Nf3'))
+    draws.push(position, 42)
+    assert draws.halfmove_clock == 42
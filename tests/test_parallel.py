@@ -0,0 +1,56 @@
+import pytest
+
+from engine.parallel import ParallelSearcher, SharedTranspositionTable
+from rules.fen import START_FEN
+from rules.movegen import generate_legal_moves
+from rules.position import Position
+
+KEY, OTHER_KEY = 0x1234, 0x1234 | 1 << 40  # Same slot, different positions
+
+
+@pytest.fixture
+def tables():
+    owner = SharedTranspositionTable(8)
+    helper = SharedTranspositionTable(8, owner.name)
+    yield owner, helper
+    helper.close()
+    owner.close(unlink=True)
+
+
+def test_entries_are_shared(tables):
+    owner, helper = tables
+    helper.store(KEY, (5, -42, 1, 777), 5)
+    assert owner.probe(KEY) == (5, -42, 1, 777)
+    assert owner.probe(KEY, 6) is None
+    assert owner.probe(OTHER_KEY) is None
+
+
+def test_only_the_owner_advances_the_generation(tables):
+    owner, helper = tables
+    owner.new_generation()
+    helper.new_generation()
+    assert owner.generation == helper.generation == 1
+
+
+def test_clear_resets_the_generation_everywhere(tables):
+    owner, helper = tables
+    for _ in range(3):
+        owner.new_generation()
+    owner.clear()
+    assert helper.generation == 0
+    # A deep entry of the current generation keeps its slot against a shallower one
+    helper.store(KEY, (6, 10, 0, 1), 6)
+    owner.store(OTHER_KEY, (2, 20, 0, 2), 2)
+    assert owner.probe(KEY) == (6, 10, 0, 1)
+    # Once aged, it may be replaced
+    owner.new_generation()
+    owner.store(OTHER_KEY, (2, 20, 0, 2), 2)
+    assert helper.probe(OTHER_KEY) == (2, 20, 0, 2)
+
+
+def test_parallel_search_returns_a_legal_move():
+    position = Position.from_fen(START_FEN)
+    with ParallelSearcher(2, table_bits=12) as searcher:
+        result = searcher.search(position, 0.3)
+        assert result.move in generate_legal_moves(position)
+        assert position.to_fen() == START_FEN
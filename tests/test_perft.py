@@ -0,0 +1,26 @@
+import pytest
+
+from perft import SUITE, divide, main, perft
+from rules.position import Position
+
+
+@pytest.mark.parametrize("name, fen, counts", SUITE, ids=[name for name, _, _ in SUITE])
+def test_suite_to_depth_3(name, fen, counts):
+    position = Position.from_fen(fen)
+    key = position.key
+    for depth in range(1, min(3, len(counts)) + 1):
+        assert perft(position, depth) == counts[depth - 1]
+    # The tree walk leaves the position as it found it
+    assert position.key == key
+    assert position.to_fen() == Position.from_fen(fen).to_fen()
+
+
+def test_divide_adds_up():
+    position = Position.from_fen(SUITE[1][1])
+    assert sum(count for _, count in divide(position, 2)) == SUITE[1][2][1]
+
+
+def test_main_reports_a_wrong_count(capsys):
+    assert main(["--fen", SUITE[0][1], "--depth", "2", "--expected", "401"]) == 1
+    assert "FAIL (expected 401)" in capsys.readouterr().out
+    assert main(["--fen", SUITE[0][1], "--depth", "2", "--expected", "400"]) == 0
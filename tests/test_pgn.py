@@ -0,0 +1,17 @@
+from rules.pgn import read_games
+
+
+def read_tags(text):
+    return next(read_games(text.splitlines(keepends=True))).headers
+
+
+def test_tag_escaped_backslashes():
+    assert read_tags('[Event "a\\\\\\\\"]\n\n1. e4 *\n')['Event'] == 'a\\\\'
+
+
+def test_tag_escaped_backslash_before_escaped_quote():
+    assert read_tags('[Event "a\\\\\\"b"]\n\n1. e4 *\n')['Event'] == 'a\\"b'
+
+
+def test_tag_unknown_escape_is_kept():
+    assert read_tags('[Event "a\\b"]\n\n1. e4 *\n')['Event'] == 'a\\b'
@@ -0,0 +1,54 @@
+import random
+
+from perft import SUITE
+from rules.movegen import generate_legal_moves
+from rules.position import Position
+
+
+def snapshot(position):
+    return (position.pieces[:], position.occupancy[:], position.occupied, position.squares[:],
+            position.white_turn, position.castling, position.ep_square, position.attacks_from[:],
+            position.attack_maps[:], position.kings[:], position.key)
+
+
+def fresh(position):
+    # The same position rebuilt from scratch, attacks and key included
+    return Position.from_fen(position.to_fen())
+
+
+def test_make_unmake_restores_everything():
+    rng = random.Random(1)
+    for _, fen, _ in SUITE:
+        position = Position.from_fen(fen)
+        for _ in range(40):
+            moves = generate_legal_moves(position)
+            if not moves:
+                break
+            before = snapshot(position)
+            for move in moves:
+                position.make_move(move)
+                position.unmake_move()
+                assert snapshot(position) == before
+            position.make_move(rng.choice(moves))
+
+
+def test_incremental_state_matches_a_rebuild():
+    rng = random.Random(2)
+    for _, fen, _ in SUITE:
+        position = Position.from_fen(fen)
+        for _ in range(40):
+            moves = generate_legal_moves(position)
+            if not moves:
+                break
+            position.make_move(rng.choice(moves))
+            rebuilt = fresh(position)
+            assert position.attacks_from == rebuilt.attacks_from
+            assert position.attack_maps == rebuilt.attack_maps
+            assert position.key == position.compute_key() == rebuilt.key
+
+
+def test_undo_records_stay_small():
+    position = Position.from_fen(SUITE[0][1])
+    position.make_move(generate_legal_moves(position)[0])
+    assert len(position.undo_stack[-1]) == 5
+    assert all(isinstance(value, int) or value is None for value in position.undo_stack[-1])
@@ -0,0 +1,35 @@
+from engine import Searcher
+from engine.search import MATE
+from rules.fen import START_FEN
+from rules.movegen import generate_legal_moves
+from rules.position import Position, move_to_uci
+
+
+def search(fen, **kwargs):
+    position = Position.from_fen(fen)
+    result = Searcher(table_bits=12).search(position, **kwargs)
+    assert position.to_fen() == Position.from_fen(fen).to_fen()  # Searched in place, then restored
+    return result
+
+
+def test_mate_in_one():
+    result = search("6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1", time_limit=10, max_depth=3)
+    assert move_to_uci(result.move) == "a1a8"
+    assert result.score == MATE - 1
+
+
+def test_wins_a_hanging_queen():
+    result = search("4k3/8/8/3q4/8/8/8/3RK3 w - - 0 1", time_limit=10, max_depth=2)
+    assert move_to_uci(result.move) == "d1d5"
+    assert result.score > 0
+
+
+def test_time_limit_keeps_a_legal_move():
+    result = search(START_FEN, time_limit=0.05)
+    assert result.move in generate_legal_moves(Position.from_fen(START_FEN))
+    assert result.depth >= 1
+    assert result.elapsed < 1
+
+
+def test_no_move_when_the_game_is_over():
+    assert search("R5k1/5ppp/8/8/8/8/8/6K1 b - - 0 1").move is None
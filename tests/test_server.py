@@ -0,0 +1,70 @@
+import asyncio
+import json
+
+from rules.fen import START_FEN
+from server import GameServer
+
+
+async def _exchange(requests):
+    # Send the request lines on one connection and return the replies
+    server = await asyncio.start_server(GameServer().handle_connection, '127.0.0.1', 0)
+    async with server:
+        reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+        replies = []
+        for request in requests:
+            writer.write(request.encode() + b"\n")
+            await writer.drain()
+            replies.append(json.loads(await asyncio.wait_for(reader.readline(), 5)))
+        writer.close()
+        await writer.wait_closed()
+    return replies
+
+
+def test_malformed_requests_keep_the_connection_usable():
+    replies = asyncio.run(_exchange([
+        '{"op": "new", "fen": 123}',
+        '{"op": "move", "game": [1], "move": "e2e4"}',
+        '{"op": "move", "game": true, "move": "e2e4"}',
+        '[1, 2]',
+        '{"op": "new", "id": 7}',
+    ]))
+    assert [reply["ok"] for reply in replies] == [False, False, False, False, True]
+    assert "fen" in replies[0]["error"]
+    assert "game" in replies[1]["error"]
+    assert replies[4]["id"] == 7
+    assert replies[4]["fen"] == START_FEN
+
+
+def test_unexpected_errors_become_error_replies(monkeypatch):
+    game_server = GameServer()
+
+    def broken(request, games):
+        raise KeyError("bug")
+
+    monkeypatch.setattr(game_server, "dispatch", broken)
+    reply = game_server.respond(b'{"op": "new", "id": 1}', {})
+    assert reply == {"ok": False, "error": "internal error: KeyError", "id": 1}
+
+
+def test_games_keep_no_undo_records():
+    game_server = GameServer()
+    games = {}
+    game_id = game_server.respond(b'{"op": "new"}', games)["game"]
+    for move in ("g1f3", "g8f6", "f3g1", "f6g8") * 2:
+        reply = game_server.respond(json.dumps({"op": "move", "game": game_id, "move": move}).encode(), games)
+        assert reply["ok"]
+        assert not games[game_id].position.undo_stack
+    assert reply["result"] == "repetition"
+
+
+def test_fen_keeps_its_move_counters():
+    game_server = GameServer()
+    games = {}
+    fen = "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3"
+    reply = game_server.respond(json.dumps({"op": "new", "fen": fen}).encode(), games)
+    assert reply["fen"] == fen
+    game_id = reply["game"]
+    reply = game_server.respond(json.dumps({"op": "move", "game": game_id, "move": "f1b5"}).encode(), games)
+    assert reply["fen"] == "r1bqkbnr/pppp1ppp/2n5/1B2p3/4P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3"
+    reply = game_server.respond(json.dumps({"op": "move", "game": game_id, "move": "a7a6"}).encode(), games)
+    assert reply["fen"] == "r1bqkbnr/1ppp1ppp/p1n5/1B2p3/4P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 0 4"
@@ -0,0 +1,41 @@
+import pytest
+
+from rules.fen import START_FEN
+from rules.state import GameState
+
+
+def test_state_is_not_hashable():
+    with pytest.raises(TypeError):
+        {GameState()}
+
+
+def test_key_is_a_snapshot():
+    state = GameState.from_fen(START_FEN)
+    seen = {state.key()}
+    state.play(52, 36)  # e2e4
+    assert state.key() not in seen
+    assert GameState.from_fen(START_FEN).key() in seen
+
+
+def test_equality_ignores_clocks_and_selection():
+    state = GameState.from_fen(START_FEN)
+    other = GameState.from_fen(START_FEN.replace(' 0 1', ' 7 20'))
+    other.selected = (6, 4)
+    assert state == other
+
+
+def test_copy_is_independent():
+    state = GameState.from_fen(START_FEN)
+    copy = state.copy()
+    state.play(52, 36)
+    assert copy.to_fen() == START_FEN
+    assert copy != state
+
+
+def test_play_updates_the_clocks():
+    state = GameState.from_fen(START_FEN)
+    for from_sq, to_sq in ((62, 45), (6, 21), (45, 62)):  # Nf3 Nf6 Ng1
+        state.play(from_sq, to_sq)
+    assert state.to_fen() == "rnbqkb1r/pppppppp/5n2/8/8/8/PPPPPPPP/RNBQKBNR b KQkq - 3 2"
+    state.play(12, 28)  # e7e5
+    assert state.to_fen().endswith(" w KQkq e6 0 3")
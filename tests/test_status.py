@@ -0,0 +1,57 @@
+from rules.draws import FIFTY_MOVES, REPETITION, STALEMATE
+from rules.fen import START_FEN
+from rules.state import GameState
+from rules.status import GameStatusCache
+
+# (from square, to square) of Nf3 Nf6 Ng1 Ng8
+KNIGHT_DANCE = [(62, 45), (6, 21), (45, 62), (21, 6)]
+
+
+def test_status_is_reused_until_a_move_is_played():
+    cache = GameStatusCache()
+    state = GameState.from_fen(START_FEN)
+    status = cache.get(state)
+    assert cache.get(state) is status
+    state.selected = (6, 4)  # Selecting a piece is not a move
+    assert cache.get(state) is status
+    state.play(52, 36)  # e2e4
+    moved = cache.get(state)
+    assert moved is not status
+    assert moved.move_count == 1
+    assert len(moved.moves) == 20
+    assert moved.possible_moves((1, 4)) == [(2, 4), (3, 4)]
+
+
+def test_invalidate_forgets_the_history():
+    cache = GameStatusCache()
+    state = GameState.from_fen(START_FEN)
+    cache.get(state)
+    for from_sq, to_sq in KNIGHT_DANCE * 2:
+        state.play(from_sq, to_sq)
+        status = cache.get(state)
+    assert status.draw == REPETITION
+    cache.invalidate()
+    # A new game from the same position starts a new history
+    status = cache.get(GameState.from_fen(START_FEN))
+    assert status.draw is None
+    assert status.move_count == 0
+
+
+def test_game_endings():
+    cache = GameStatusCache()
+    mate = cache.get(GameState.from_fen("R5k1/5ppp/8/8/8/8/8/6K1 b - - 0 1"))
+    assert mate.checkmate and mate.in_check and mate.king_pos == (0, 6) and mate.draw is None
+    cache.invalidate()
+    stalemate = cache.get(GameState.from_fen("k7/8/1Q6/8/8/8/8/6K1 b - - 0 1"))
+    assert stalemate.stalemate and stalemate.draw == STALEMATE
+    cache.invalidate()
+    fifty = cache.get(GameState.from_fen("4k3/8/8/8/8/8/8/R3K3 w - - 100 80"))
+    assert fifty.draw == FIFTY_MOVES
+
+
+def test_castling_highlights_the_rook_square():
+    cache = GameStatusCache()
+    status = cache.get(GameState.from_fen("4k3/8/8/8/8/8/8/4K2R w K - 0 1"))
+    assert (7, 6) in status.possible_moves((7, 4)) and (7, 5) in status.possible_moves((7, 4))
+    assert status.legal_move(60, 62) is not None
+    assert status.legal_move(60, 44) is None
@@ -0,0 +1,50 @@
+import pytest
+
+from rules.position import Position
+from rules.tablebase import (
+    DRAW, EXTENSION, HEADER, LOSS, MAGIC, WIN, Tablebases, check_material, decode, generate_table,
+)
+
+# White king e1 (60), white queen d4 (35), black king h8 (7)
+KQK_FEN = "7k/8/8/8/3Q4/8/8/4K3 {} - - 0 1"
+
+
+@pytest.fixture
+def tablebases(tmp_path):
+    # A KQK table where only two entries are known, enough to check the indexing
+    values = bytearray(2 * 64 ** 3)
+    values[(0 * 64 + 60) * 64 * 64 + 35 * 64 + 7] = 20  # White to move mates in 19 plies
+    values[(1 * 64 + 60) * 64 * 64 + 35 * 64 + 7] = 19  # Black to move is mated in 18 plies
+    (tmp_path / ("KQK" + EXTENSION)).write_bytes(HEADER.pack(MAGIC, 3, b'KQK') + bytes(values))
+    with Tablebases(str(tmp_path)) as tables:
+        yield tables
+
+
+def test_decode():
+    assert decode(0) == (DRAW, 0)
+    assert decode(1) == (LOSS, 0)
+    assert decode(20) == (WIN, 19)
+
+
+def test_probe(tablebases):
+    assert tablebases.probe(Position.from_fen(KQK_FEN.format('w'))) == (WIN, 19)
+    assert tablebases.probe(Position.from_fen(KQK_FEN.format('b'))) == (LOSS, 18)
+
+
+def test_probe_mirrors_the_colours(tablebases):
+    # The same endgame with black holding the queen, the board flipped vertically
+    assert tablebases.probe(Position.from_fen("4k3/8/8/3q4/8/8/8/7K b - - 0 1")) == (WIN, 19)
+
+
+def test_probe_outside_the_tables(tablebases):
+    assert tablebases.probe(Position.from_fen("7k/8/8/8/3R4/8/8/4K3 w - - 0 1")) is None
+    assert tablebases.probe(Position.from_fen("7k/8/8/8/8/8/8/4K3 w - - 0 1")) == (DRAW, 0)
+    assert tablebases.probe(Position.from_fen("r3k3/8/8/8/3Q4/8/8/4K3 w q - 0 1")) is None
+
+
+def test_pawns_on_both_sides_are_rejected():
+    assert check_material('kpk') == check_material('KPK')
+    with pytest.raises(ValueError, match="en passant"):
+        check_material('KPKP')
+    with pytest.raises(ValueError, match="en passant"):
+        generate_table('KPKP')
@@ -0,0 +1,34 @@
+import time
+
+from rules.fen import START_FEN
+from tournament import ILLEGAL_MOVE, TIME_FORFEIT, play_game
+
+
+def hang(position, moves, rng):
+    try:
+        while True:
+            pass
+    except Exception:
+        return moves[0]
+
+
+def illegal(position, moves, rng):
+    return 0
+
+
+def test_hung_player_forfeits():
+    start = time.perf_counter()
+    _, result, reason, played, _, error = play_game((0, START_FEN, ('random', 'test_tournament:hang'), 0.05, 10, 1))
+    assert time.perf_counter() - start < 5
+    assert (result, reason, error) == ('1-0', TIME_FORFEIT, '')
+    assert len(played) == 1
+
+
+def test_illegal_move_loses():
+    _, result, reason, played, _, _ = play_game((0, START_FEN, ('test_tournament:illegal', 'random'), 0.1, 10, 1))
+    assert (result, reason, played) == ('0-1', ILLEGAL_MOVE, [])
+
+
+def test_random_games_are_repeatable():
+    task = (3, START_FEN, ('random', 'random'), 0.1, 60, 7)
+    assert play_game(task)[:4] == play_game(task)[:4]
@@ -0,0 +1,42 @@
+from rules.fen import START_FEN
+from rules.pgn import parse_san
+from rules.position import Position
+from rules.transposition import TranspositionTable
+
+
+def after(sans, fen=START_FEN):
+    position = Position.from_fen(fen)
+    for san in sans:
+        position.make_move(parse_san(position, san))
+    return position
+
+
+def test_transpositions_share_a_key():
+    assert after(['Nf3', 'Nf6', 'd4']).key == after(['d4', 'Nf6', 'Nf3']).key
+    assert after(['Nf3', 'Nf6', 'Ng1', 'Ng8']).key == Position.from_fen(START_FEN).key
+
+
+def test_side_castling_and_en_passant_change_the_key():
+    assert after(['Nf3']).key != after(['Nf3', 'Nf6', 'Ng1']).key
+    # Same placement, but the rooks went out and back: no castling rights left
+    assert after(['a4', 'a5', 'Ra3', 'Ra6', 'Ra1', 'Ra8']).key != after(['a4', 'a5']).key
+    # An en passant square only counts when a pawn can take
+    assert after(['e4']).key == Position.from_fen("rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1").key
+    with_capture = "rnbqkbnr/ppp1pppp/8/8/3pP3/8/PPPP1PPP/RNBQKBNR b KQkq {} 0 3"
+    assert Position.from_fen(with_capture.format('e3')).key != Position.from_fen(with_capture.format('-')).key
+
+
+def test_replacement_policy():
+    table = TranspositionTable(4)
+    table.store(1, 'deep', 5)
+    table.store(17, 'shallow', 2)  # Same slot, shallower: the deeper entry stays
+    assert table.probe(1) == 'deep' and table.probe(17) is None
+    assert table.probe(1, 6) is None
+    table.new_generation()
+    table.store(17, 'new', 2)  # Older generation: replaced
+    assert table.probe(17) == 'new' and table.probe(1) is None
+    table.store(17, 'update', 1)  # Same position: always replaced
+    assert table.probe(17) == 'update'
+    assert len(table) == 1
+    table.clear()
+    assert len(table) == 0 and table.generation == 0
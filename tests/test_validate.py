@@ -0,0 +1,32 @@
+from rules.pgn import read_games
+from validate import validate_games
+
+PGN = """[Event "ok"]
+
+1. e4 e5 2. Nf3 Nc6 1/2-1/2
+
+[Event "illegal"]
+
+1. e4 e5 2. Ke3 *
+
+[Event "bad fen"]
+[FEN "8/8/8/8/8/8/8/8 w - - 0 1"]
+
+1. e4 *
+"""
+
+
+def rows(workers, chunk_size=1):
+    return list(validate_games(read_games(PGN.splitlines(keepends=True)), workers, chunk_size))
+
+
+def test_report_rows():
+    ok, illegal, bad_fen = rows(1)
+    assert ok[:4] == (1, 1, "ok", "1/2-1/2")
+    assert ok[4] == "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq -"
+    assert illegal[:3] == (2, 5, "illegal") and illegal[5] == 3
+    assert bad_fen[:3] == (3, 9, "invalid start")
+
+
+def test_workers_keep_the_input_order():
+    assert rows(2) == rows(1)